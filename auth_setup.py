@@ -8,10 +8,13 @@ Sistema de configuração inicial de autenticação Google OAuth 2.0
 import os
 import sys
 import json
+import time
 import logging
+from datetime import timezone
 from pathlib import Path
 from typing import Optional, Dict, Any
 from dotenv import load_dotenv
+import requests
 
 # Importações Google Auth
 from google.auth.transport.requests import Request
@@ -34,23 +37,40 @@ logger = logging.getLogger(__name__)
 class GoogleAuthSetup:
     """Configurador de autenticação Google OAuth 2.0"""
     
+    # Configurações OAuth (imutáveis, compartilhadas entre instâncias)
+    SCOPES = (
+        'https://www.googleapis.com/auth/cloud-platform',
+        'https://www.googleapis.com/auth/drive.readonly',
+        'https://www.googleapis.com/auth/youtube.readonly',
+        'https://www.googleapis.com/auth/gmail.readonly',
+        'https://www.googleapis.com/auth/analytics.readonly'
+    )
+    
     def __init__(self):
         """Inicializa o configurador de autenticação"""
         # Carrega variáveis de ambiente
         load_dotenv('.env')
         
-        # Configurações OAuth
-        self.SCOPES = [
-            'https://www.googleapis.com/auth/cloud-platform',
-            'https://www.googleapis.com/auth/drive.readonly',
-            'https://www.googleapis.com/auth/youtube.readonly',
-            'https://www.googleapis.com/auth/gmail.readonly',
-            'https://www.googleapis.com/auth/analytics.readonly'
-        ]
-        
         # Caminhos dos arquivos
         self.credentials_file = os.getenv('GOOGLE_CREDENTIALS_FILE', 'credentials.json')
         self.token_file = os.getenv('GOOGLE_AUTH_TOKEN_PATH', 'token.json')
+        self._credentials_path = Path(self.credentials_file)
+        self._token_path = Path(self.token_file)
+        
+        # Cache curto de existência dos arquivos (evita stat repetido em polling)
+        self._exists_cache: Dict[Path, bool] = {}
+        self._exists_cache_ts = 0.0
+        self._exists_cache_ttl = 1.0
+        
+        # Sessão HTTP persistente para chamadas ao endpoint OAuth (reaproveita conexão TLS)
+        self._http = requests.Session()
+        
+        # Validade conhecida das credenciais (epoch), evita recarregar o token a cada status
+        self._auth_valid_until: Optional[float] = None
+        
+        # Credenciais já carregadas, chaveadas por (mtime_ns, tamanho) do token
+        self._loaded_creds: Optional[Credentials] = None
+        self._loaded_creds_key: Optional[tuple] = None
         
         # Configurações do cliente
         self.client_id = os.getenv('GOOGLE_CLIENT_ID')
@@ -58,6 +78,44 @@ class GoogleAuthSetup:
         self.project_id = os.getenv('GOOGLE_PROJECT_ID')
         
         logger.info("🔧 Google Auth Setup inicializado")
+    
+    def _cached_exists(self, path: Path) -> bool:
+        """Verifica existência dos arquivos de auth com cache de curta duração"""
+        now = time.monotonic()
+        if now - self._exists_cache_ts > self._exists_cache_ttl:
+            self._exists_cache = {
+                self._credentials_path: self._credentials_path.exists(),
+                self._token_path: self._token_path.exists()
+            }
+            self._exists_cache_ts = now
+        
+        if path not in self._exists_cache:
+            self._exists_cache[path] = path.exists()
+        return self._exists_cache[path]
+    
+    @property
+    def is_authenticated(self) -> bool:
+        """Indica se as últimas credenciais vistas ainda estão dentro da validade"""
+        return self._auth_valid_until is not None and time.time() < self._auth_valid_until
+    
+    def _remember_validity(self, creds: Optional[Credentials]):
+        """Guarda até quando as credenciais são válidas (com 60s de margem)"""
+        if creds and creds.valid and creds.expiry:
+            self._auth_valid_until = creds.expiry.replace(tzinfo=timezone.utc).timestamp() - 60
+        else:
+            self._auth_valid_until = None
+    
+    def _token_stat_key(self) -> Optional[tuple]:
+        """(mtime_ns, tamanho) atual do token, ou None se não puder ser lido"""
+        try:
+            stat = os.stat(self.token_file)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    def _invalidate_exists_cache(self):
+        """Descarta o cache de existência após escrever arquivos de auth"""
+        self._exists_cache_ts = 0.0
         
     def validate_environment(self) -> bool:
         """Valida se todas as variáveis de ambiente estão configuradas"""
@@ -82,7 +140,7 @@ class GoogleAuthSetup:
             return False
             
         # Verifica se o arquivo de credenciais existe
-        if not Path(self.credentials_file).exists():
+        if not self._cached_exists(self._credentials_path):
             logger.error(f"❌ Arquivo de credenciais não encontrado: {self.credentials_file}")
             return False
         else:
@@ -92,16 +150,25 @@ class GoogleAuthSetup:
     
     def load_existing_credentials(self) -> Optional[Credentials]:
         """Carrega credenciais existentes se disponíveis"""
-        if not Path(self.token_file).exists():
+        if not self._cached_exists(self._token_path):
             logger.info("ℹ️ Arquivo de token não encontrado - primeira autenticação")
             return None
             
         try:
+            stat = os.stat(self.token_file)
+            cache_key = (stat.st_mtime_ns, stat.st_size)
+            if cache_key == self._loaded_creds_key:
+                return self._loaded_creds
+            
             creds = Credentials.from_authorized_user_file(self.token_file, self.SCOPES)
+            self._loaded_creds = creds
+            self._loaded_creds_key = cache_key
+            self._remember_validity(creds)
             logger.info("✅ Credenciais existentes carregadas")
             return creds
         except Exception as e:
             logger.warning(f"⚠️ Erro ao carregar credenciais existentes: {e}")
+            self._auth_valid_until = None
             return None
     
     def refresh_credentials(self, creds: Credentials) -> bool:
@@ -109,13 +176,14 @@ class GoogleAuthSetup:
         try:
             if creds.expired and creds.refresh_token:
                 logger.info("🔄 Renovando credenciais expiradas...")
-                creds.refresh(Request())
+                creds.refresh(Request(session=self._http))
                 self.save_credentials(creds)
                 logger.info("✅ Credenciais renovadas com sucesso")
                 return True
             return True
         except Exception as e:
             logger.error(f"❌ Erro ao renovar credenciais: {e}")
+            self._auth_valid_until = None
             return False
     
     def perform_oauth_flow(self) -> Optional[Credentials]:
@@ -151,11 +219,20 @@ class GoogleAuthSetup:
     def save_credentials(self, creds: Credentials) -> bool:
         """Salva credenciais no arquivo token.json"""
         try:
-            with open(self.token_file, 'w') as token:
+            # Escreve em arquivo temporário e substitui atomicamente
+            tmp_file = f"{self.token_file}.tmp"
+            with open(tmp_file, 'w') as token:
                 token.write(creds.to_json())
             
-            # Define permissões seguras
-            os.chmod(self.token_file, 0o600)
+            # Define permissões seguras antes de expor o token
+            os.chmod(tmp_file, 0o600)
+            os.replace(tmp_file, self.token_file)
+            self._invalidate_exists_cache()
+            self._remember_validity(creds)
+            
+            stat = os.stat(self.token_file)
+            self._loaded_creds = creds
+            self._loaded_creds_key = (stat.st_mtime_ns, stat.st_size)
             logger.info(f"✅ Credenciais salvas em: {self.token_file}")
             return True
             
@@ -171,7 +248,7 @@ class GoogleAuthSetup:
             logger.info("🧪 Testando credenciais...")
             
             # Testa com a API do YouTube (mais simples)
-            service = build('youtube', 'v3', credentials=creds)
+            service = build('youtube', 'v3', credentials=creds, cache_discovery=False, static_discovery=True)
             request = service.channels().list(part='snippet', mine=True)
             
             # Não executa a requisição, apenas verifica se pode ser criada
@@ -225,14 +302,20 @@ class GoogleAuthSetup:
     def get_auth_status(self) -> Dict[str, Any]:
         """Retorna status atual da autenticação"""
         status = {
-            'credentials_file_exists': Path(self.credentials_file).exists(),
-            'token_file_exists': Path(self.token_file).exists(),
+            'credentials_file_exists': self._cached_exists(self._credentials_path),
+            'token_file_exists': self._cached_exists(self._token_path),
             'environment_valid': self.validate_environment(),
             'credentials_valid': False,
             'credentials_expired': False,
             'scopes': self.SCOPES
         }
         
+        # Atalho só enquanto o token em disco for o mesmo já carregado
+        if (status['token_file_exists'] and self.is_authenticated
+                and self._token_stat_key() == self._loaded_creds_key):
+            status['credentials_valid'] = True
+            return status
+        
         creds = self.load_existing_credentials()
         if creds:
             status['credentials_valid'] = creds.valid
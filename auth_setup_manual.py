@@ -153,7 +153,7 @@ class GoogleAuthSetupManual:
             logger.info("🧪 Testando credenciais...")
             
             # Testa com a API do YouTube (mais simples)
-            service = build('youtube', 'v3', credentials=creds)
+            service = build('youtube', 'v3', credentials=creds, cache_discovery=False, static_discovery=True)
             
             # Não executa a requisição, apenas verifica se pode ser criada
             logger.info("✅ Credenciais válidas - serviço criado com sucesso")
@@ -30,6 +30,18 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+def install_uvloop():
+    """Usa uvloop nos event loops criados pelas rotas (se instalado)"""
+    try:
+        import asyncio
+        import uvloop
+    except ImportError:
+        return False
+
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    logger.info("⚡ uvloop ativado como event loop padrão")
+    return True
+
 def create_app():
     """Cria e configura a aplicação Flask"""
 
@@ -195,6 +207,9 @@ def main():
     print("🚀 ARQV30 Enhanced v3.0 - Iniciando aplicação...")
 
     try:
+        # Event loop mais rápido para as coletas assíncronas
+        install_uvloop()
+
         # Cria aplicação
         app = create_app()
 
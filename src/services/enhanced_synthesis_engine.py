@@ -6,15 +6,112 @@ Motor de síntese aprimorado com busca ativa e análise profunda
 """
 
 import os
+import re
+import time
 import logging
 import json
 import asyncio
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple, Iterator
 from datetime import datetime
 from pathlib import Path
+from dataclasses import dataclass
+from functools import lru_cache
+
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
 
 logger = logging.getLogger(__name__)
 
+# Bloco ```json ... ``` retornado pelos modelos (até a última cerca)
+_JSON_FENCE_RE = re.compile(r"```json(.*)```", re.DOTALL)
+
+# Indicadores de busca ativa citados pela IA na síntese
+_SEARCH_INDICATORS = (
+    'busca realizada', 'pesquisa online', 'dados encontrados',
+    'informações atualizadas', 'validação online'
+)
+
+# Textos menores que o menor indicador não podem conter nenhuma ocorrência
+_MIN_INDICATOR_LEN = min(map(len, _SEARCH_INDICATORS))
+
+def _build_search_matcher():
+    """Monta o matcher multi-padrão (uma única varredura do texto)"""
+    if HAS_AHOCORASICK:
+        automaton = ahocorasick.Automaton()
+        for indicator in _SEARCH_INDICATORS:
+            automaton.add_word(indicator, indicator)
+        automaton.make_automaton()
+        return automaton
+    # Sem Aho-Corasick: regex case-insensitive dispensa a cópia em minúsculas do texto
+    return re.compile('|'.join(map(re.escape, _SEARCH_INDICATORS)), re.IGNORECASE)
+
+_SEARCH_MATCHER = _build_search_matcher()
+
+# Prompt interno da fase map da síntese map-reduce (não é um tipo de síntese)
+_PARTIAL_ANALYSIS_PROMPT = """
+# ANALISTA DE DADOS - ANÁLISE PARCIAL
+
+Você está analisando UMA PARTE de um relatório maior. Extraia desta parte,
+de forma objetiva e sem inventar dados:
+- Insights principais e dados de mercado (com números e fontes)
+- Oportunidades identificadas
+- Dores, desejos e comportamentos do público-alvo
+- Estratégias e casos citados
+
+Responda em tópicos concisos; a síntese final será feita depois.
+
+PARTE DO RELATÓRIO:
+"""
+
+# Templates das linhas repetidas do relatório de síntese
+_REPORT_TIME_FMT = '%d/%m/%Y %H:%M:%S'
+_NUMBERED_FMT = "%d. %s\n"
+_BOLD_NUMBERED_FMT = "**%d.** %s\n\n"
+_BULLET_FMT = "- %s\n"
+_LABELED_BULLET_FMT = "- **%s:** %s\n"
+_LABELED_FMT = "**%s:** %s\n\n"
+_VALIDATION_FMT = (
+    "**Nível de Confiança:** %s  \n"
+    "**Fontes Consultadas:** %d  \n"
+    "**Dados Validados:** %s  \n"
+)
+
+@dataclass(frozen=True)
+class SessionPaths:
+    """Caminhos dos artefatos de uma sessão"""
+    base: Path
+    collection_report: Path
+    viral_report: Path
+    resumo_sintese: Path
+
+    def synthesis(self, synthesis_type: str) -> Path:
+        """Caminho do JSON de síntese para o tipo informado"""
+        return self.base / f"sintese_{synthesis_type}.json"
+
+@lru_cache(maxsize=1024)
+def _session_paths(session_id: str) -> SessionPaths:
+    """Monta (uma única vez por sessão) os caminhos usados pelo motor de síntese"""
+    base = Path("analyses_data") / session_id
+    return SessionPaths(
+        base=base,
+        collection_report=base / "relatorio_coleta.md",
+        viral_report=base / "relatorio_viral.md",
+        resumo_sintese=base / "resumo_sintese.json"
+    )
+
+@lru_cache(maxsize=64)
+def _read_text_cached(path_str: str, mtime_ns: int) -> str:
+    """Lê um arquivo de texto; a chave inclui o mtime para invalidar quando ele é reescrito"""
+    with open(path_str, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def _read_text(path: Path) -> str:
+    """Lê o arquivo reaproveitando o conteúdo se ele não mudou desde a última leitura"""
+    return _read_text_cached(str(path), path.stat().st_mtime_ns)
+
 class EnhancedSynthesisEngine:
     """Motor de síntese aprimorado com IA e busca ativa"""
 
@@ -23,6 +120,16 @@ class EnhancedSynthesisEngine:
         self.synthesis_prompts = self._load_enhanced_prompts()
         self.ai_manager = None
         self._initialize_ai_manager()
+
+        # Contextos maiores que o limite são sintetizados em map-reduce
+        self.map_reduce_threshold_chars = 60000
+        self.map_chunk_max_chars = 30000
+        self.partial_analysis_prompt = _PARTIAL_ANALYSIS_PROMPT
+        # Análises parciais simultâneas (cada uma pode disparar buscas e chamadas à IA)
+        self.map_max_concurrency = max(1, int(os.getenv('SYNTHESIS_MAP_CONCURRENCY', '4')))
+
+        # Respostas maiores que isso são parseadas fora do event loop
+        self.threaded_parse_min_chars = 256 * 1024
         
         logger.info("🧠 Enhanced Synthesis Engine inicializado")
 
@@ -237,18 +344,28 @@ DADOS PARA ANÁLISE:
             if not self.ai_manager:
                 raise Exception("AI Manager não disponível")
             
-            synthesis_result = await self.ai_manager.generate_with_active_search(
-                prompt=base_prompt,
-                context=full_context,
-                session_id=session_id,
-                max_search_iterations=5
-            )
+            if len(full_context) > self.map_reduce_threshold_chars:
+                synthesis_result = await self._synthesize_map_reduce(
+                    base_prompt, collection_report, viral_report, session_id
+                )
+            else:
+                synthesis_result = await self.ai_manager.generate_with_active_search(
+                    prompt=base_prompt,
+                    context=full_context,
+                    session_id=session_id,
+                    max_search_iterations=5
+                )
             
             # 6. Processa e valida resultado
-            processed_synthesis = self._process_synthesis_result(synthesis_result)
+            if len(synthesis_result) > self.threaded_parse_min_chars:
+                processed_synthesis = await asyncio.to_thread(self._process_synthesis_result, synthesis_result)
+            else:
+                processed_synthesis = self._process_synthesis_result(synthesis_result)
             
-            # 7. Salva síntese
-            synthesis_path = self._save_synthesis_result(session_id, processed_synthesis, synthesis_type)
+            # 7. Salva síntese (serialização e escrita fora do event loop)
+            synthesis_path = await asyncio.to_thread(
+                self._save_synthesis_result, session_id, processed_synthesis, synthesis_type
+            )
             
             # 8. Gera relatório de síntese
             synthesis_report = self._generate_synthesis_report(processed_synthesis, session_id)
@@ -275,13 +392,91 @@ DADOS PARA ANÁLISE:
                 "timestamp": datetime.now().isoformat()
             }
 
+    async def _synthesize_map_reduce(
+        self,
+        base_prompt: str,
+        collection_report: str,
+        viral_report: Optional[str],
+        session_id: str
+    ) -> str:
+        """
+        Sintetiza contextos grandes em duas fases: análises parciais
+        concorrentes por seção (map, limitadas por map_max_concurrency)
+        e uma síntese final sobre elas (reduce)
+        """
+        chunks = self._split_report_sections(collection_report, self.map_chunk_max_chars)
+        if viral_report:
+            chunks.extend(self._split_report_sections(viral_report, self.map_chunk_max_chars))
+
+        logger.info(f"🧩 Contexto grande: síntese map-reduce em {len(chunks)} partes")
+
+        semaphore = asyncio.Semaphore(self.map_max_concurrency)
+
+        async def analyze_chunk(chunk: str) -> str:
+            async with semaphore:
+                return await self.ai_manager.generate_with_active_search(
+                    prompt=self.partial_analysis_prompt,
+                    context=chunk,
+                    session_id=session_id,
+                    max_search_iterations=1
+                )
+
+        partials = await asyncio.gather(
+            *[analyze_chunk(chunk) for chunk in chunks],
+            return_exceptions=True
+        )
+
+        partial_texts = []
+        for i, partial in enumerate(partials, 1):
+            if isinstance(partial, Exception):
+                logger.warning(f"⚠️ Análise parcial {i}/{len(chunks)} falhou: {partial}")
+                continue
+            partial_texts.append(f"=== ANÁLISE PARCIAL {i} ===\n{partial}")
+
+        if not partial_texts:
+            raise Exception("Todas as análises parciais falharam")
+
+        reduce_context = self._build_synthesis_context("\n\n".join(partial_texts))
+        return await self.ai_manager.generate_with_active_search(
+            prompt=base_prompt,
+            context=reduce_context,
+            session_id=session_id,
+            max_search_iterations=5
+        )
+
+    @staticmethod
+    def _split_report_sections(report: str, max_chars: int) -> list:
+        """Divide um relatório markdown por seções de nível 1/2 respeitando max_chars"""
+        sections = re.split(r"\n(?=#{1,2} )", report)
+
+        chunks = []
+        current = ""
+        for section in sections:
+            # Seções maiores que o limite são cortadas em blocos fixos
+            while len(section) > max_chars:
+                if current:
+                    chunks.append(current)
+                    current = ""
+                chunks.append(section[:max_chars])
+                section = section[max_chars:]
+
+            if current and len(current) + len(section) + 1 > max_chars:
+                chunks.append(current)
+                current = section
+            else:
+                current = f"{current}\n{section}" if current else section
+
+        if current:
+            chunks.append(current)
+
+        return chunks
+
     def _load_collection_report(self, session_id: str) -> Optional[str]:
         """Carrega relatório de coleta"""
         try:
-            report_path = Path(f"analyses_data/{session_id}/relatorio_coleta.md")
+            report_path = _session_paths(session_id).collection_report
             if report_path.exists():
-                with open(report_path, 'r', encoding='utf-8') as f:
-                    return f.read()
+                return _read_text(report_path)
             
             logger.warning(f"⚠️ Relatório de coleta não encontrado: {report_path}")
             return None
@@ -293,10 +488,9 @@ DADOS PARA ANÁLISE:
     def _load_viral_report(self, session_id: str) -> Optional[str]:
         """Carrega relatório de conteúdo viral se disponível"""
         try:
-            viral_path = Path(f"analyses_data/{session_id}/relatorio_viral.md")
+            viral_path = _session_paths(session_id).viral_report
             if viral_path.exists():
-                with open(viral_path, 'r', encoding='utf-8') as f:
-                    return f.read()
+                return _read_text(viral_path)
             return None
         except Exception as e:
             logger.warning(f"⚠️ Relatório viral não disponível: {e}")
@@ -337,17 +531,30 @@ DADOS PARA ANÁLISE:
         
         return context
 
+    @staticmethod
+    def _extract_json_from_llm(text: str) -> Tuple[Optional[Any], str]:
+        """
+        Extrai JSON de uma resposta de LLM
+
+        Returns:
+            (dados, origem) onde origem é "fenced" (bloco ```json),
+            "raw" (resposta inteira) ou "text" (nenhum JSON válido)
+        """
+        match = _JSON_FENCE_RE.search(text)
+        if match:
+            return json.loads(match.group(1).strip()), "fenced"
+
+        try:
+            return json.loads(text), "raw"
+        except json.JSONDecodeError:
+            return None, "text"
+
     def _process_synthesis_result(self, synthesis_result: str) -> Dict[str, Any]:
         """Processa resultado da síntese"""
         try:
-            # Tenta extrair JSON da resposta
-            if "```json" in synthesis_result:
-                start = synthesis_result.find("```json") + 7
-                end = synthesis_result.rfind("```")
-                json_text = synthesis_result[start:end].strip()
-                
-                parsed_data = json.loads(json_text)
-                
+            parsed_data, source = self._extract_json_from_llm(synthesis_result)
+
+            if source == "fenced":
                 # Adiciona metadados
                 parsed_data['metadata_sintese'] = {
                     'generated_at': datetime.now().isoformat(),
@@ -359,12 +566,11 @@ DADOS PARA ANÁLISE:
                 
                 return parsed_data
             
-            # Se não encontrar JSON, tenta parsear a resposta inteira
-            try:
-                return json.loads(synthesis_result)
-            except json.JSONDecodeError:
-                # Fallback: cria estrutura básica
-                return self._create_enhanced_fallback_synthesis(synthesis_result)
+            if source == "raw":
+                return parsed_data
+
+            # Fallback: cria estrutura básica
+            return self._create_enhanced_fallback_synthesis(synthesis_result)
                 
         except Exception as e:
             logger.error(f"❌ Erro ao processar síntese: {e}")
@@ -427,19 +633,21 @@ DADOS PARA ANÁLISE:
     ) -> str:
         """Salva resultado da síntese"""
         try:
-            session_dir = Path(f"analyses_data/{session_id}")
-            session_dir.mkdir(parents=True, exist_ok=True)
+            paths = _session_paths(session_id)
+            paths.base.mkdir(parents=True, exist_ok=True)
             
+            payload = json.dumps(synthesis_data, ensure_ascii=False, indent=2)
+
             # Salva JSON estruturado
-            synthesis_path = session_dir / f"sintese_{synthesis_type}.json"
+            synthesis_path = paths.synthesis(synthesis_type)
             with open(synthesis_path, 'w', encoding='utf-8') as f:
-                json.dump(synthesis_data, f, ensure_ascii=False, indent=2)
+                f.write(payload)
             
             # Salva também como resumo_sintese.json para compatibilidade
             if synthesis_type == 'master_synthesis':
-                compat_path = session_dir / "resumo_sintese.json"
+                compat_path = paths.resumo_sintese
                 with open(compat_path, 'w', encoding='utf-8') as f:
-                    json.dump(synthesis_data, f, ensure_ascii=False, indent=2)
+                    f.write(payload)
             
             return str(synthesis_path)
             
@@ -453,11 +661,20 @@ DADOS PARA ANÁLISE:
         session_id: str
     ) -> str:
         """Gera relatório legível da síntese"""
+        return ''.join(self._iter_synthesis_report(synthesis_data, session_id))
+
+    def _iter_synthesis_report(
+        self, 
+        synthesis_data: Dict[str, Any], 
+        session_id: str
+    ) -> Iterator[str]:
+        """Gera o relatório da síntese em partes, para consumo em streaming"""
         
-        report = f"""# RELATÓRIO DE SÍNTESE - ARQV30 Enhanced v3.0
+        generated_at = time.strftime(_REPORT_TIME_FMT)
+        yield f"""# RELATÓRIO DE SÍNTESE - ARQV30 Enhanced v3.0
 
 **Sessão:** {session_id}  
-**Gerado em:** {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}  
+**Gerado em:** {generated_at}  
 **Engine:** Enhanced Synthesis Engine v3.0  
 **Busca Ativa:** ✅ Habilitada
 
@@ -470,111 +687,105 @@ DADOS PARA ANÁLISE:
         # Adiciona insights principais
         insights = synthesis_data.get('insights_principais', [])
         for i, insight in enumerate(insights, 1):
-            report += f"{i}. {insight}\n"
+            yield _NUMBERED_FMT % (i, insight)
         
-        report += "\n---\n\n## OPORTUNIDADES IDENTIFICADAS\n\n"
+        yield "\n---\n\n## OPORTUNIDADES IDENTIFICADAS\n\n"
         
         # Adiciona oportunidades
         oportunidades = synthesis_data.get('oportunidades_identificadas', [])
         for i, oportunidade in enumerate(oportunidades, 1):
-            report += f"**{i}.** {oportunidade}\n\n"
+            yield _BOLD_NUMBERED_FMT % (i, oportunidade)
         
         # Público-alvo refinado
         publico = synthesis_data.get('publico_alvo_refinado', {})
         if publico:
-            report += "---\n\n## PÚBLICO-ALVO REFINADO\n\n"
+            yield "---\n\n## PÚBLICO-ALVO REFINADO\n\n"
             
             # Demografia
             demo = publico.get('demografia_detalhada', {})
             if demo:
-                report += "### Demografia Detalhada:\n"
+                yield "### Demografia Detalhada:\n"
                 for key, value in demo.items():
                     label = key.replace('_', ' ').title()
-                    report += f"- **{label}:** {value}\n"
+                    yield _LABELED_BULLET_FMT % (label, value)
             
             # Psicografia
             psico = publico.get('psicografia_profunda', {})
             if psico:
-                report += "\n### Psicografia Profunda:\n"
+                yield "\n### Psicografia Profunda:\n"
                 for key, value in psico.items():
                     label = key.replace('_', ' ').title()
-                    report += f"- **{label}:** {value}\n"
+                    yield _LABELED_BULLET_FMT % (label, value)
             
             # Dores e desejos
             dores = publico.get('dores_viscerais_reais', [])
             if dores:
-                report += "\n### Dores Viscerais Identificadas:\n"
+                yield "\n### Dores Viscerais Identificadas:\n"
                 for i, dor in enumerate(dores[:10], 1):
-                    report += f"{i}. {dor}\n"
+                    yield _NUMBERED_FMT % (i, dor)
             
             desejos = publico.get('desejos_ardentes_reais', [])
             if desejos:
-                report += "\n### Desejos Ardentes Identificados:\n"
+                yield "\n### Desejos Ardentes Identificados:\n"
                 for i, desejo in enumerate(desejos[:10], 1):
-                    report += f"{i}. {desejo}\n"
+                    yield _NUMBERED_FMT % (i, desejo)
         
         # Dados de mercado validados
         mercado = synthesis_data.get('dados_mercado_validados', {})
         if mercado:
-            report += "\n---\n\n## DADOS DE MERCADO VALIDADOS\n\n"
+            yield "\n---\n\n## DADOS DE MERCADO VALIDADOS\n\n"
             for key, value in mercado.items():
                 label = key.replace('_', ' ').title()
-                report += f"**{label}:** {value}\n\n"
+                yield _LABELED_FMT % (label, value)
         
         # Estratégias recomendadas
         estrategias = synthesis_data.get('estrategias_recomendadas', [])
         if estrategias:
-            report += "---\n\n## ESTRATÉGIAS RECOMENDADAS\n\n"
+            yield "---\n\n## ESTRATÉGIAS RECOMENDADAS\n\n"
             for i, estrategia in enumerate(estrategias, 1):
-                report += f"**{i}.** {estrategia}\n\n"
+                yield _BOLD_NUMBERED_FMT % (i, estrategia)
         
         # Plano de ação
         plano = synthesis_data.get('plano_acao_imediato', {})
         if plano:
-            report += "---\n\n## PLANO DE AÇÃO IMEDIATO\n\n"
+            yield "---\n\n## PLANO DE AÇÃO IMEDIATO\n\n"
             
             if plano.get('primeiros_30_dias'):
-                report += "### Primeiros 30 Dias:\n"
+                yield "### Primeiros 30 Dias:\n"
                 for acao in plano['primeiros_30_dias']:
-                    report += f"- {acao}\n"
+                    yield _BULLET_FMT % (acao,)
             
             if plano.get('proximos_90_dias'):
-                report += "\n### Próximos 90 Dias:\n"
+                yield "\n### Próximos 90 Dias:\n"
                 for acao in plano['proximos_90_dias']:
-                    report += f"- {acao}\n"
+                    yield _BULLET_FMT % (acao,)
             
             if plano.get('primeiro_ano'):
-                report += "\n### Primeiro Ano:\n"
+                yield "\n### Primeiro Ano:\n"
                 for acao in plano['primeiro_ano']:
-                    report += f"- {acao}\n"
+                    yield _BULLET_FMT % (acao,)
         
         # Validação de dados
         validacao = synthesis_data.get('validacao_dados', {})
         if validacao:
-            report += "\n---\n\n## VALIDAÇÃO DE DADOS\n\n"
-            report += f"**Nível de Confiança:** {validacao.get('nivel_confianca', 'N/A')}  \n"
-            report += f"**Fontes Consultadas:** {len(validacao.get('fontes_consultadas', []))}  \n"
-            report += f"**Dados Validados:** {validacao.get('dados_validados', 'N/A')}  \n"
-        
-        report += f"\n---\n\n*Síntese gerada com busca ativa em {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}*"
+            yield "\n---\n\n## VALIDAÇÃO DE DADOS\n\n"
+            yield _VALIDATION_FMT % (
+                validacao.get('nivel_confianca', 'N/A'),
+                len(validacao.get('fontes_consultadas', [])),
+                validacao.get('dados_validados', 'N/A')
+            )
         
-        return report
+        yield f"\n---\n\n*Síntese gerada com busca ativa em {generated_at}*"
 
     def _count_ai_searches(self, synthesis_text: str) -> int:
         """Conta quantas buscas a IA realizou"""
-        # Conta menções de busca no texto
-        search_indicators = [
-            'busca realizada', 'pesquisa online', 'dados encontrados',
-            'informações atualizadas', 'validação online'
-        ]
-        
-        count = 0
-        text_lower = synthesis_text.lower()
-        
-        for indicator in search_indicators:
-            count += text_lower.count(indicator)
-        
-        return count
+        if len(synthesis_text) < _MIN_INDICATOR_LEN:
+            return 0
+
+        # Conta menções de busca no texto em uma única passada
+        if HAS_AHOCORASICK:
+            return sum(1 for _ in _SEARCH_MATCHER.iter(synthesis_text.lower()))
+        return len(_SEARCH_MATCHER.findall(synthesis_text))
 
     async def execute_behavioral_synthesis(self, session_id: str) -> Dict[str, Any]:
         """Executa síntese comportamental específica"""
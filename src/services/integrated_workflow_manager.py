@@ -6,27 +6,222 @@ Integra análise de documentos com workflow principal
 """
 
 import os
+import re
 import json
 import logging
+import tempfile
+import threading
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from functools import lru_cache
+from itertools import islice
+from stat import S_IMODE
+from typing import Dict, List, Any, Optional, Tuple, Iterator
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import simdjson
+    HAS_SIMDJSON = True
+except ImportError:
+    HAS_SIMDJSON = False
+
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
 
 logger = logging.getLogger(__name__)
 
+_thread_state = threading.local()
+
+# Únicas chaves de analysis_results.json consumidas pelo workflow
+_DOCUMENT_RESULT_KEYS = ('insights', 'synthesis', 'analysis_summary')
+
+# Palavras-chave (minúsculas) usadas para classificar insights
+_MARKET_KEYWORDS = (
+    'mercado', 'cliente', 'concorrente', 'preço', 'demanda', 'oferta',
+    'segmento', 'público', 'target', 'consumidor', 'vendas', 'receita'
+)
+_SEGMENT_KEYWORDS = ('segmento', 'público')
+_MODULE_KEYWORDS = {
+    'market_analysis': ('mercado', 'demanda', 'oferta', 'tamanho', 'crescimento'),
+    'competitor_analysis': ('concorrente', 'competição', 'rival', 'benchmark'),
+    'opportunity_analysis': ('oportunidade', 'potencial', 'chance', 'nicho')
+}
+
+# (chave em document_insights, título, template da descrição, prioridade, categoria)
+_RECOMMENDATION_SPECS = (
+    ('insights', 'Recomendação baseada em Insight de Documento', '%s', 'medium', 'document_insight'),
+    ('correlations', 'Aproveitar Correlação Identificada', 'Explorar a correlação: %s', 'high', 'correlation'),
+    ('opportunities', 'Explorar Oportunidade Identificada', '%s', 'high', 'opportunity')
+)
+
+def _compile_keywords(keywords):
+    """
+    Compila um conjunto de palavras-chave em um matcher multi-padrão:
+    autômato Aho-Corasick quando disponível, senão uma única regex
+    """
+    if HAS_AHOCORASICK:
+        automaton = ahocorasick.Automaton()
+        for keyword in keywords:
+            automaton.add_word(keyword, keyword)
+        automaton.make_automaton()
+        return automaton
+    return re.compile('|'.join(map(re.escape, keywords)))
+
+def _has_keyword(matcher, lowered_text: str) -> bool:
+    """Indica se o texto (já em minúsculas) contém alguma palavra-chave do matcher"""
+    if HAS_AHOCORASICK:
+        return next(matcher.iter(lowered_text), None) is not None
+    return matcher.search(lowered_text) is not None
+
+_MARKET_MATCHER = _compile_keywords(_MARKET_KEYWORDS)
+_MODULE_KEYWORD_MATCHERS = {
+    module_type: _compile_keywords(keywords)
+    for module_type, keywords in _MODULE_KEYWORDS.items()
+}
+
+def _read_json(path: str) -> Any:
+    """Lê um arquivo JSON (orjson quando disponível)"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return orjson.loads(data) if HAS_ORJSON else json.loads(data)
+
+def _dump_json(data: Any, indent: bool = True) -> bytes:
+    """Serializa para JSON em UTF-8, usando orjson quando disponível"""
+    if HAS_ORJSON:
+        try:
+            option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+            return orjson.dumps(data, option=option)
+        except TypeError:
+            # Tipos que o orjson não suporta seguem pelo json padrão
+            pass
+    if indent:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def _process_umask() -> int:
+    """Lê o umask do processo (os.umask só permite ler trocando o valor)"""
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+# Modo padrão de arquivos novos, lido uma vez na importação (trocar o umask não é thread-safe)
+_DEFAULT_FILE_MODE = 0o666 & ~_process_umask()
+
+def _target_file_mode(path: str) -> int:
+    """Modo do arquivo existente em path, ou o padrão do umask para arquivos novos"""
+    try:
+        return S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return _DEFAULT_FILE_MODE
+
+def _write_json(path: str, data: Any, indent: bool = True):
+    """
+    Escreve um arquivo JSON de forma atômica: serializa antes de abrir,
+    grava em arquivo temporário exclusivo e substitui com os.replace
+    """
+    payload = _dump_json(data, indent)
+    tmp_file = tempfile.NamedTemporaryFile(
+        dir=os.path.dirname(path) or '.', prefix='.tmp-', suffix='.json', delete=False
+    )
+    try:
+        with tmp_file:
+            tmp_file.write(payload)
+        # NamedTemporaryFile cria com 0600: mantém o modo do destino (ou o padrão do umask)
+        os.chmod(tmp_file.name, _target_file_mode(path))
+        os.replace(tmp_file.name, path)
+    except Exception:
+        os.unlink(tmp_file.name)
+        raise
+
+def _simdjson_parser():
+    """Parser simdjson reutilizável por thread (não é thread-safe)"""
+    parser = getattr(_thread_state, 'simdjson_parser', None)
+    if parser is None:
+        parser = _thread_state.simdjson_parser = simdjson.Parser()
+    return parser
+
+def _read_json_sections(path: str, sections: Tuple[str, ...]) -> Any:
+    """
+    Lê um JSON materializando apenas as seções de topo informadas
+    (parse sob demanda com simdjson)
+    """
+    with open(path, 'rb') as f:
+        doc = _simdjson_parser().parse(f.read())
+    
+    if not isinstance(doc, simdjson.Object):
+        return doc.as_list() if isinstance(doc, simdjson.Array) else doc
+    
+    results = {}
+    for key in sections:
+        if key in doc:
+            value = doc[key]
+            if isinstance(value, simdjson.Object):
+                value = value.as_dict()
+            elif isinstance(value, simdjson.Array):
+                value = value.as_list()
+            results[key] = value
+    
+    # Preserva a veracidade do dict quando o documento não tem as seções usadas
+    if not results and len(doc):
+        results = doc.as_dict()
+    
+    return results
+
+@lru_cache(maxsize=32)
+def _load_json_cached(path: str, mtime_ns: int, size: int, sections: Optional[Tuple[str, ...]] = None) -> Any:
+    """
+    Carrega um JSON com cache; mtime e tamanho fazem parte da chave,
+    então a entrada é invalidada quando o arquivo é reescrito.
+    O resultado é compartilhado entre chamadas e não deve ser mutado.
+    """
+    if sections and HAS_SIMDJSON:
+        return _read_json_sections(path, sections)
+    return _read_json(path)
+
+@lru_cache(maxsize=32)
+def _load_document_cached(path: str, mtime_ns: int, size: int) -> Tuple[Any, Tuple[str, ...]]:
+    """
+    Carrega analysis_results.json junto com as versões em minúsculas de
+    insights.key_insights, calculadas uma vez por versão do arquivo e
+    reaproveitadas por todas as varreduras de palavras-chave.
+    O índice nunca falha a carga: itens que não são texto viram '' e
+    mantêm o alinhamento com a lista original.
+    """
+    document_results = _load_json_cached(path, mtime_ns, size, _DOCUMENT_RESULT_KEYS)
+    lowered = ()
+    insights = document_results.get('insights') if isinstance(document_results, dict) else None
+    if isinstance(insights, dict):
+        key_insights = insights.get('key_insights')
+        if isinstance(key_insights, list):
+            lowered = tuple(
+                insight.lower() if isinstance(insight, str) else ''
+                for insight in key_insights
+            )
+    return document_results, lowered
+
 class IntegratedWorkflowManager:
     """Gerenciador que integra análise de documentos com workflow principal"""
     
-    def __init__(self):
-        self.upload_folder = 'uploads/documents'
-        self.data_folder = 'analyses_data'
-        
+    # Sem estado por instância: caminhos fixos no nível da classe
+    __slots__ = ()
+    
+    UPLOAD_FOLDER = 'uploads/documents'
+    DATA_FOLDER = 'analyses_data'
+    
     def integrate_document_insights(self, session_id: str, document_session_id: str) -> Dict:
         """Integra insights dos documentos no workflow principal"""
         try:
             logger.info(f"Integrando insights de documentos para sessão {session_id}")
             
             # Carrega resultados da análise de documentos
-            document_results = self._load_document_results(document_session_id)
+            document_results, _ = self._load_document_results(document_session_id)
             
             if not document_results:
                 logger.warning(f"Nenhum resultado de documento encontrado para {document_session_id}")
@@ -60,26 +255,26 @@ class IntegratedWorkflowManager:
     def enhance_market_analysis_with_documents(self, market_data: Dict, document_session_id: str) -> Dict:
         """Enriquece análise de mercado com insights dos documentos"""
         try:
-            document_results = self._load_document_results(document_session_id)
+            document_results, lowered_insights = self._load_document_results(document_session_id)
             
             if not document_results:
                 return market_data
             
             # Extrai insights relevantes para mercado
-            market_insights = self._extract_market_relevant_insights(document_results)
+            market_insights = self._extract_market_relevant_insights(document_results, lowered_insights)
             
             # Enriquece dados de mercado
-            enhanced_data = market_data.copy()
-            enhanced_data['document_enhanced'] = True
-            enhanced_data['document_insights'] = market_insights
-            enhanced_data['enhanced_segments'] = self._enhance_segments_with_documents(
-                market_data.get('segments', {}), market_insights
-            )
-            enhanced_data['enhanced_opportunities'] = self._enhance_opportunities_with_documents(
-                market_data.get('opportunities', []), market_insights
-            )
-            
-            return enhanced_data
+            return {
+                **market_data,
+                'document_enhanced': True,
+                'document_insights': market_insights,
+                'enhanced_segments': self._enhance_segments_with_documents(
+                    market_data.get('segments', {}), market_insights
+                ),
+                'enhanced_opportunities': self._enhance_opportunities_with_documents(
+                    market_data.get('opportunities', []), market_insights
+                )
+            }
             
         except Exception as e:
             logger.error(f"Erro ao enriquecer análise de mercado: {e}")
@@ -96,26 +291,19 @@ class IntegratedWorkflowManager:
             
             document_insights = integration_data.get('document_insights', {})
             
-            # Gera recomendações integradas
-            integrated_recommendations = []
-            
-            # Recomendações baseadas em insights de documentos
-            for insight in document_insights.get('insights', []):
-                recommendation = self._convert_insight_to_recommendation(insight)
-                if recommendation:
-                    integrated_recommendations.append(recommendation)
-            
-            # Recomendações baseadas em correlações
-            for correlation in document_insights.get('correlations', []):
-                recommendation = self._convert_correlation_to_recommendation(correlation)
-                if recommendation:
-                    integrated_recommendations.append(recommendation)
+            # Análise vazia (score 0 e nenhuma fonte de recomendação): nada a gerar
+            if document_insights.get('confidence_score', 0.5) == 0 and not any(
+                document_insights.get(spec[0]) for spec in _RECOMMENDATION_SPECS
+            ):
+                return {
+                    'recommendations': [],
+                    'confidence': 0.0,
+                    'source': 'integrated_document_analysis',
+                    'generated_at': datetime.now().isoformat()
+                }
             
-            # Recomendações baseadas em oportunidades identificadas
-            for opportunity in document_insights.get('opportunities', []):
-                recommendation = self._convert_opportunity_to_recommendation(opportunity)
-                if recommendation:
-                    integrated_recommendations.append(recommendation)
+            # Gera recomendações integradas (insights, correlações e oportunidades), top 10
+            integrated_recommendations = list(islice(self._iter_recommendations(document_insights), 10))
             
             # Calcula score de confiança
             confidence_score = self._calculate_recommendation_confidence(
@@ -123,7 +311,7 @@ class IntegratedWorkflowManager:
             )
             
             return {
-                'recommendations': integrated_recommendations[:10],  # Top 10
+                'recommendations': integrated_recommendations,
                 'confidence': confidence_score,
                 'source': 'integrated_document_analysis',
                 'generated_at': datetime.now().isoformat()
@@ -136,7 +324,7 @@ class IntegratedWorkflowManager:
     def create_document_enhanced_modules(self, base_modules: List[Dict], document_session_id: str) -> List[Dict]:
         """Cria módulos enriquecidos com insights dos documentos"""
         try:
-            document_results = self._load_document_results(document_session_id)
+            document_results, lowered_insights = self._load_document_results(document_session_id)
             
             if not document_results:
                 return base_modules
@@ -149,7 +337,7 @@ class IntegratedWorkflowManager:
                 # Adiciona seção de insights de documentos
                 if module.get('type') in ['market_analysis', 'competitor_analysis', 'opportunity_analysis']:
                     enhanced_module['document_insights'] = self._get_relevant_document_insights(
-                        document_results, module.get('type')
+                        document_results, lowered_insights, module.get('type')
                     )
                     enhanced_module['enhanced'] = True
                 
@@ -165,20 +353,21 @@ class IntegratedWorkflowManager:
             logger.error(f"Erro ao criar módulos enriquecidos: {e}")
             return base_modules
     
-    def _load_document_results(self, document_session_id: str) -> Optional[Dict]:
-        """Carrega resultados da análise de documentos"""
+    def _load_document_results(self, document_session_id: str) -> Tuple[Optional[Dict], Tuple[str, ...]]:
+        """Carrega resultados da análise de documentos e os key_insights em minúsculas"""
         try:
-            results_path = os.path.join(self.upload_folder, document_session_id, 'analysis_results.json')
+            results_path = os.path.join(self.UPLOAD_FOLDER, document_session_id, 'analysis_results.json')
             
-            if not os.path.exists(results_path):
-                return None
+            try:
+                stat = os.stat(results_path)
+            except FileNotFoundError:
+                return None, ()
             
-            with open(results_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return _load_document_cached(results_path, stat.st_mtime_ns, stat.st_size)
                 
         except Exception as e:
             logger.error(f"Erro ao carregar resultados de documentos: {e}")
-            return None
+            return None, ()
     
     def _extract_key_insights_for_workflow(self, document_results: Dict) -> Dict:
         """Extrai insights principais para integração no workflow"""
@@ -196,25 +385,24 @@ class IntegratedWorkflowManager:
             'confidence_score': document_results.get('analysis_summary', {}).get('analysis_quality_score', 0.5)
         }
     
-    def _extract_market_relevant_insights(self, document_results: Dict) -> Dict:
+    def _extract_market_relevant_insights(self, document_results: Dict, lowered_insights: Tuple[str, ...]) -> Dict:
         """Extrai insights relevantes para análise de mercado"""
         all_insights = self._extract_key_insights_for_workflow(document_results)
         
         # Filtra insights relevantes para mercado
-        market_keywords = [
-            'mercado', 'cliente', 'concorrente', 'preço', 'demanda', 'oferta',
-            'segmento', 'público', 'target', 'consumidor', 'vendas', 'receita'
-        ]
-        
         market_insights = {}
         
         for key, items in all_insights.items():
             if isinstance(items, list):
-                market_items = []
-                for item in items:
-                    if any(keyword in item.lower() for keyword in market_keywords):
-                        market_items.append(item)
-                market_insights[key] = market_items
+                if key == 'insights':
+                    # Prefixo de key_insights: reaproveita o índice em minúsculas do documento
+                    lowered_items = lowered_insights[:len(items)]
+                else:
+                    lowered_items = [item.lower() for item in items]
+                market_insights[key] = [
+                    item for item, lowered in zip(items, lowered_items)
+                    if _has_keyword(_MARKET_MATCHER, lowered)
+                ]
             else:
                 market_insights[key] = items
         
@@ -222,72 +410,51 @@ class IntegratedWorkflowManager:
     
     def _enhance_segments_with_documents(self, segments: Dict, document_insights: Dict) -> Dict:
         """Enriquece segmentos de mercado com insights dos documentos"""
-        enhanced_segments = segments.copy()
+        lowered_insights = [(insight, insight.lower()) for insight in document_insights.get('insights', [])]
         
-        # Adiciona insights de documentos aos segmentos
-        for segment_name, segment_data in enhanced_segments.items():
-            segment_data['document_insights'] = []
-            
-            # Busca insights relevantes para o segmento
-            for insight in document_insights.get('insights', []):
-                if any(keyword in insight.lower() for keyword in [segment_name.lower(), 'segmento', 'público']):
-                    segment_data['document_insights'].append(insight)
+        def relevant_insights(segment_name: str) -> List[str]:
+            """Busca insights relevantes para o segmento"""
+            keywords = (segment_name.lower(),) + _SEGMENT_KEYWORDS
+            return [
+                insight for insight, lowered in lowered_insights
+                if any(keyword in lowered for keyword in keywords)
+            ]
         
-        return enhanced_segments
+        # Adiciona insights de documentos em cópias dos segmentos (não altera os dados do chamador)
+        return {
+            segment_name: {**segment_data, 'document_insights': relevant_insights(segment_name)}
+            for segment_name, segment_data in segments.items()
+        }
     
     def _enhance_opportunities_with_documents(self, opportunities: List, document_insights: Dict) -> List:
         """Enriquece oportunidades com insights dos documentos"""
-        enhanced_opportunities = opportunities.copy()
+        confidence = document_insights.get('confidence_score', 0.5)
         
-        # Adiciona oportunidades identificadas nos documentos
-        for doc_opportunity in document_insights.get('opportunities', []):
-            enhanced_opportunities.append({
+        # Adiciona oportunidades identificadas nos documentos (nova lista, sem cópia prévia)
+        return opportunities + [
+            {
                 'title': 'Oportunidade Identificada em Documentos',
                 'description': doc_opportunity,
                 'source': 'document_analysis',
-                'confidence': document_insights.get('confidence_score', 0.5)
-            })
-        
-        return enhanced_opportunities
-    
-    def _convert_insight_to_recommendation(self, insight: str) -> Optional[Dict]:
-        """Converte insight em recomendação acionável"""
-        if len(insight.strip()) < 20:  # Muito curto
-            return None
-        
-        return {
-            'title': 'Recomendação baseada em Insight de Documento',
-            'description': insight,
-            'priority': 'medium',
-            'category': 'document_insight',
-            'actionable': True
-        }
-    
-    def _convert_correlation_to_recommendation(self, correlation: str) -> Optional[Dict]:
-        """Converte correlação em recomendação"""
-        if len(correlation.strip()) < 20:
-            return None
-        
-        return {
-            'title': 'Aproveitar Correlação Identificada',
-            'description': f"Explorar a correlação: {correlation}",
-            'priority': 'high',
-            'category': 'correlation',
-            'actionable': True
-        }
+                'confidence': confidence
+            }
+            for doc_opportunity in document_insights.get('opportunities', [])
+        ]
     
-    def _convert_opportunity_to_recommendation(self, opportunity: str) -> Optional[Dict]:
-        """Converte oportunidade em recomendação"""
-        if len(opportunity.strip()) < 20:
-            return None
-        
-        return {
-            'title': 'Explorar Oportunidade Identificada',
-            'description': opportunity,
-            'priority': 'high',
-            'category': 'opportunity',
-            'actionable': True
-        }
+    def _iter_recommendations(self, document_insights: Dict) -> Iterator[Dict]:
+        """Converte insights, correlações e oportunidades em recomendações acionáveis"""
+        for key, title, description_fmt, priority, category in _RECOMMENDATION_SPECS:
+            for text in document_insights.get(key, []):
+                if len(text.strip()) < 20:  # Muito curto
+                    continue
+                
+                yield {
+                    'title': title,
+                    'description': description_fmt % (text,),
+                    'priority': priority,
+                    'category': category,
+                    'actionable': True
+                }
     
     def _calculate_recommendation_confidence(self, recommendations: List[Dict], insights: Dict) -> float:
         """Calcula score de confiança das recomendações"""
@@ -302,25 +469,27 @@ class IntegratedWorkflowManager:
         
         return (base_confidence + quantity_factor + diversity_factor) / 3
     
-    def _get_relevant_document_insights(self, document_results: Dict, module_type: str) -> List[str]:
+    def _get_relevant_document_insights(
+        self, 
+        document_results: Dict, 
+        lowered_insights: Tuple[str, ...], 
+        module_type: str
+    ) -> List[str]:
         """Obtém insights relevantes para tipo específico de módulo"""
         all_insights = document_results.get('insights', {}).get('key_insights', [])
         
         # Palavras-chave por tipo de módulo
-        keywords_map = {
-            'market_analysis': ['mercado', 'demanda', 'oferta', 'tamanho', 'crescimento'],
-            'competitor_analysis': ['concorrente', 'competição', 'rival', 'benchmark'],
-            'opportunity_analysis': ['oportunidade', 'potencial', 'chance', 'nicho']
-        }
-        
-        keywords = keywords_map.get(module_type, [])
-        relevant_insights = []
+        matcher = _MODULE_KEYWORD_MATCHERS.get(module_type)
+        if matcher is None:
+            return []
         
-        for insight in all_insights:
-            if any(keyword in insight.lower() for keyword in keywords):
-                relevant_insights.append(insight)
+        # Top 3 mais relevantes: para de varrer assim que os 3 primeiros são encontrados
+        relevant_insights = (
+            insight for insight, lowered in zip(all_insights, lowered_insights)
+            if _has_keyword(matcher, lowered)
+        )
         
-        return relevant_insights[:3]  # Top 3 mais relevantes
+        return list(islice(relevant_insights, 3))
     
     def _create_document_analysis_module(self, document_results: Dict) -> Dict:
         """Cria módulo específico de análise de documentos"""
@@ -358,13 +527,13 @@ class IntegratedWorkflowManager:
     def _save_integration_data(self, session_id: str, integration_data: Dict):
         """Salva dados de integração"""
         try:
-            session_dir = os.path.join(self.data_folder, session_id)
+            session_dir = os.path.join(self.DATA_FOLDER, session_id)
             os.makedirs(session_dir, exist_ok=True)
             
             integration_path = os.path.join(session_dir, 'document_integration.json')
             
-            with open(integration_path, 'w', encoding='utf-8') as f:
-                json.dump(integration_data, f, indent=2, ensure_ascii=False)
+            # Arquivo consumido apenas por _load_integration_data: JSON compacto
+            _write_json(integration_path, integration_data, indent=False)
                 
         except Exception as e:
             logger.error(f"Erro ao salvar dados de integração: {e}")
@@ -372,13 +541,14 @@ class IntegratedWorkflowManager:
     def _load_integration_data(self, session_id: str) -> Optional[Dict]:
         """Carrega dados de integração"""
         try:
-            integration_path = os.path.join(self.data_folder, session_id, 'document_integration.json')
+            integration_path = os.path.join(self.DATA_FOLDER, session_id, 'document_integration.json')
             
-            if not os.path.exists(integration_path):
+            try:
+                stat = os.stat(integration_path)
+            except FileNotFoundError:
                 return None
             
-            with open(integration_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return _load_json_cached(integration_path, stat.st_mtime_ns, stat.st_size)
                 
         except Exception as e:
             logger.error(f"Erro ao carregar dados de integração: {e}")
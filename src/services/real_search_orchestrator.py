@@ -8,14 +8,41 @@ import os
 import logging
 import asyncio
 import aiohttp
+import atexit
 import time
+import hashlib
+import heapq
+import threading
+import functools
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
 from typing import Dict, List, Any, Optional
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import quote_plus
 import json
 logger = logging.getLogger(__name__)
 
+try:
+    import redis
+    HAS_REDIS = True
+except ImportError:
+    HAS_REDIS = False
+
+# Playwright para screenshots assíncronos (fallback: Selenium)
+try:
+    from playwright.async_api import async_playwright
+    HAS_PLAYWRIGHT = True
+except ImportError:
+    HAS_PLAYWRIGHT = False
+
+# orjson para decodificar as respostas das APIs (fallback: json)
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 # Importa serviços existentes
 from services.enhanced_search_coordinator import enhanced_search_coordinator
 from services.social_media_extractor import social_media_extractor
@@ -27,8 +54,113 @@ from services.trendfinder_client import trendfinder_client
 from services.supadata_mcp_client import supadata_client
 from services.visual_content_capture import visual_content_capture
 
+# Sessão HTTP da busca em andamento. O orquestrador global é usado por threads
+# com event loops próprios, então a sessão vive no contexto da chamada (e é
+# herdada pelas tasks do gather), não na instância.
+_current_http_session: ContextVar[Optional[aiohttp.ClientSession]] = ContextVar(
+    '_current_http_session', default=None
+)
+# Semáforos por provedor, com o mesmo escopo (e event loop) da sessão HTTP
+_current_provider_slots: ContextVar[Optional[Dict[str, asyncio.Semaphore]]] = ContextVar(
+    '_current_provider_slots', default=None
+)
+
+
+async def _read_json(response: aiohttp.ClientResponse) -> Any:
+    """Lê o corpo da resposta e decodifica o JSON (orjson quando disponível)"""
+    body = await response.read()
+    if HAS_ORJSON:
+        return orjson.loads(body)
+    return json.loads(body)
+
+@functools.lru_cache(maxsize=1)
+def _load_api_keys_from_env() -> Dict[str, tuple]:
+    """Lê as chaves de API do ambiente uma única vez por processo"""
+    api_keys = {}
+    for provider in ['FIRECRAWL', 'JINA', 'GOOGLE', 'EXA', 'SERPER', 'YOUTUBE', 'SUPADATA', 'X']:
+        keys = []
+        # Chave principal
+        main_key = os.getenv(f"{provider}_API_KEY")
+        if main_key:
+            keys.append(main_key)
+        # Chaves numeradas
+        counter = 1
+        while True:
+            numbered_key = os.getenv(f"{provider}_API_KEY_{counter}")
+            if numbered_key:
+                keys.append(numbered_key)
+                counter += 1
+            else:
+                break
+        if keys:
+            api_keys[provider] = tuple(keys)
+            logger.info(f"✅ {provider}: {len(keys)} chaves carregadas")
+    return api_keys
+
+def _cached_result(provider: str):
+    """Cache de leitura para buscas de provedor, chaveado por (provedor, argumentos)"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, query: str, *args, **kwargs):
+            return await self._cached_call(
+                provider, lambda: func(self, query, *args, **kwargs), query, *args, **kwargs
+            )
+        return wrapper
+    return decorator
+
+class TokenBucket:
+    """Limitador de taxa token bucket (seguro entre threads e event loops)"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, cost: float) -> float:
+        """Reserva os tokens e retorna quantos segundos aguardar por eles"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= cost
+            return max(0.0, -self._tokens / self.rate)
+
+    async def acquire(self, cost: float = 1):
+        """Aguarda até haver tokens suficientes para a requisição"""
+        wait = self._reserve(cost)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+@dataclass(frozen=True)
+class ProviderConfig:
+    """Configuração estática de um provedor de busca"""
+    name: str
+    url: str
+    keys: tuple
+    rate: float
+    burst: float
+    timeout: Optional[float] = None
+
+# Provedores: (nome, URL base, requisições/s por chave, rajada, tempo máximo padrão em s)
+_PROVIDER_TABLE = (
+    ('FIRECRAWL', 'https://api.firecrawl.dev/v0/scrape', 1, 5, 15),
+    ('JINA', 'https://r.jina.ai/', 3, 10, 15),
+    ('GOOGLE', 'https://www.googleapis.com/customsearch/v1', 10, 20, 5),
+    ('EXA', 'https://api.exa.ai/search', 5, 10, 10),
+    ('SERPER', 'https://google.serper.dev/search', 50, 100, 5),
+    ('YOUTUBE', 'https://www.googleapis.com/youtube/v3/search', 10, 20, 20),
+    ('SUPADATA', 'https://server.smithery.ai/@supadata-ai/mcp/mcp', 1, 5, None),
+    ('X', 'https://api.twitter.com/2/tweets/search/recent', 0.5, 5, None)
+)
+
 class RealSearchOrchestrator:
     """Orquestrador de busca REAL massiva - ZERO SIMULAÇÃO com Sistema de Fallback"""
+    
+    # Caminho do ChromeDriver resolvido pelo webdriver-manager (compartilhado)
+    _chromedriver_path: Optional[str] = None
+    
     def __init__(self):
         """Inicializa orquestrador com sistema de rotação e fallback"""
         # Importa o novo sistema de rotação
@@ -43,6 +175,7 @@ class RealSearchOrchestrator:
         # Mantém compatibilidade com código existente
         self.api_keys = self._load_all_api_keys()
         self.key_indices = {provider: 0 for provider in self.api_keys.keys()}
+        self.available_providers = frozenset(self.api_keys)
         
         # Provedores em ordem de prioridade (agora gerenciado pelo api_manager)
         self.providers = [
@@ -56,15 +189,34 @@ class RealSearchOrchestrator:
             'SUPADATA'
         ]
         
-        # URLs base dos serviços
-        self.service_urls = {
-            'FIRECRAWL': 'https://api.firecrawl.dev/v0/scrape',
-            'JINA': 'https://r.jina.ai/',
-            'GOOGLE': 'https://www.googleapis.com/customsearch/v1',
-            'EXA': 'https://api.exa.ai/search',
-            'SERPER': 'https://google.serper.dev/search',
-            'YOUTUBE': 'https://www.googleapis.com/youtube/v3/search',
-            'SUPADATA': os.getenv('SUPADATA_API_URL', 'https://server.smithery.ai/@supadata-ai/mcp/mcp')
+        # Buscas web da FASE 2, resolvidas uma vez para os provedores com chave
+        self._web_searchers = tuple(
+            (provider, getattr(self, f"_search_{name}"))
+            for provider, name in (
+                ('FIRECRAWL', 'firecrawl'),
+                ('JINA', 'jina'),
+                ('GOOGLE', 'google'),
+                ('EXA', 'exa'),
+                ('SERPER', 'serper')
+            )
+            if provider in self.available_providers
+        )
+        
+        # Navegador Selenium reutilizado entre sessões (fallback de screenshots)
+        self._driver = None
+        self._driver_lock = threading.Lock()
+        # Garante que o Chrome headless não sobreviva ao processo
+        atexit.register(self._quit_selenium_driver)
+        
+        # Requisições simultâneas por provedor e tentativas com rotação de chave em 429/403
+        self.max_concurrent_per_provider = 8
+        self.max_key_attempts = 3
+        
+        # Configuração por provedor (URL, chaves, limite de taxa e tempo máximo)
+        self.provider_configs = self._build_provider_configs()
+        self._buckets = {
+            name: TokenBucket(config.rate * len(config.keys) or config.rate, config.burst)
+            for name, config in self.provider_configs.items()
         }
         
         self.session_stats = {
@@ -73,34 +225,195 @@ class RealSearchOrchestrator:
             'failed_searches': 0,
             'api_rotations': {},
             'content_extracted': 0,
-            'screenshots_captured': 0
+            'screenshots_captured': 0,
+            'cache_hits': 0,
+            'cache_misses': 0
         }
         
+        # Cache de resultados por (provedor, query): Redis se configurado, senão memória
+        self.result_cache_ttl = int(os.getenv('SEARCH_RESULT_CACHE_TTL', '600'))
+        self._redis = self._setup_result_cache()
+        # Em memória: dict em ordem de inserção (= ordem de expiração, TTL fixo), limitado
+        self._local_cache: Dict[str, tuple] = {}
+        self.local_cache_max_entries = 1000
+        
         logger.info(f"🚀 Real Search Orchestrator inicializado com Sistema de Fallback Avançado")
         logger.info(f"📊 Status APIs: {len(self.api_manager.providers)} provedores disponíveis")
 
     def _load_all_api_keys(self) -> Dict[str, List[str]]:
         """Carrega todas as chaves de API do ambiente"""
-        api_keys = {}
-        for provider in ['FIRECRAWL', 'JINA', 'GOOGLE', 'EXA', 'SERPER', 'YOUTUBE', 'SUPADATA', 'X']:
-            keys = []
-            # Chave principal
-            main_key = os.getenv(f"{provider}_API_KEY")
-            if main_key:
-                keys.append(main_key)
-            # Chaves numeradas
-            counter = 1
-            while True:
-                numbered_key = os.getenv(f"{provider}_API_KEY_{counter}")
-                if numbered_key:
-                    keys.append(numbered_key)
-                    counter += 1
-                else:
-                    break
-            if keys:
-                api_keys[provider] = keys
-                logger.info(f"✅ {provider}: {len(keys)} chaves carregadas")
-        return api_keys
+        return {provider: list(keys) for provider, keys in _load_api_keys_from_env().items()}
+
+    def _build_provider_configs(self) -> Dict[str, ProviderConfig]:
+        """Monta a configuração de cada provedor (tempo máximo ajustável via <PROVEDOR>_SEARCH_TIMEOUT)"""
+        configs = {}
+        for name, url, rate, burst, timeout in _PROVIDER_TABLE:
+            if name == 'SUPADATA':
+                url = os.getenv('SUPADATA_API_URL', url)
+            timeout_env = os.getenv(f"{name}_SEARCH_TIMEOUT")
+            configs[name] = ProviderConfig(
+                name=name,
+                url=url,
+                keys=tuple(self.api_keys.get(name, ())),
+                rate=rate,
+                burst=burst,
+                timeout=float(timeout_env) if timeout_env else timeout
+            )
+        return configs
+
+    def _setup_result_cache(self):
+        """Conecta ao Redis (REDIS_URL) para o cache de resultados"""
+        redis_url = os.getenv('REDIS_URL')
+        if not HAS_REDIS or not redis_url:
+            return None
+        try:
+            client = redis.Redis.from_url(redis_url, socket_timeout=1, socket_connect_timeout=1)
+            client.ping()
+            logger.info("✅ Cache de resultados em Redis ativo")
+            return client
+        except Exception as e:
+            logger.warning(f"⚠️ Redis indisponível, usando cache em memória: {e}")
+            return None
+
+    def _result_cache_key(self, provider: str, *args, **kwargs) -> str:
+        """Gera chave search:{provider}:{sha1} a partir dos argumentos da busca"""
+        raw = json.dumps([args, kwargs], sort_keys=True, ensure_ascii=False, default=str)
+        return f"search:{provider}:{hashlib.sha1(raw.encode('utf-8')).hexdigest()}"
+
+    async def _cached_call(self, provider: str, fetch, *args, **kwargs) -> Dict[str, Any]:
+        """Retorna o resultado em cache ou executa a busca e guarda se bem-sucedida"""
+        key = self._result_cache_key(provider, *args, **kwargs)
+        
+        blob = None
+        if self._redis is not None:
+            try:
+                blob = await asyncio.to_thread(self._redis.get, key)
+            except Exception as e:
+                logger.debug(f"Falha ao ler cache Redis {key}: {e}")
+        else:
+            entry = self._local_cache.get(key)
+            if entry and entry[0] > time.monotonic():
+                blob = entry[1]
+        
+        if blob is not None:
+            self.session_stats['cache_hits'] += 1
+            logger.info(f"🔄 {provider}: resultado do cache")
+            return json.loads(blob)
+        
+        self.session_stats['cache_misses'] += 1
+        result = await fetch()
+        
+        if isinstance(result, dict) and result.get('success'):
+            blob = json.dumps(result, ensure_ascii=False, default=str)
+            if self._redis is not None:
+                try:
+                    await asyncio.to_thread(self._redis.setex, key, self.result_cache_ttl, blob)
+                except Exception as e:
+                    logger.debug(f"Falha ao gravar cache Redis {key}: {e}")
+            else:
+                now = time.monotonic()
+                # Reinsere no fim para manter a ordem de expiração
+                self._local_cache.pop(key, None)
+                if len(self._local_cache) >= self.local_cache_max_entries:
+                    self._local_cache = {
+                        k: entry for k, entry in self._local_cache.items() if entry[0] > now
+                    }
+                    # Ainda cheio com entradas válidas: descarta as mais antigas
+                    while len(self._local_cache) >= self.local_cache_max_entries:
+                        del self._local_cache[next(iter(self._local_cache))]
+                self._local_cache[key] = (now + self.result_cache_ttl, blob)
+        
+        return result
+
+    async def _with_timeout(self, provider: str, coro) -> Dict[str, Any]:
+        """Limita o tempo de uma busca para que um provedor lento não atrase o gather"""
+        config = self.provider_configs.get(provider)
+        timeout = config.timeout if config else None
+        try:
+            return await asyncio.wait_for(coro, timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"⏱️ {provider}: tempo limite de {timeout}s excedido")
+            return {'success': False, 'provider': provider, 'error': 'timeout'}
+
+    @asynccontextmanager
+    async def _provider_request(
+        self,
+        provider: str,
+        method: str,
+        url: str,
+        api_key: str,
+        key_field: tuple,
+        **request_kwargs
+    ):
+        """Requisição ao provedor com limite de concorrência e rotação de chave em 429/403
+        
+        key_field indica onde a chave vai na requisição: (seção, campo, modelo),
+        ex.: ('headers', 'Authorization', 'Bearer {key}').
+        """
+        section, field, template = key_field
+        slots = _current_provider_slots.get()
+        if slots is None:
+            slots = {}
+        semaphore = slots.get(provider)
+        if semaphore is None:
+            semaphore = slots[provider] = asyncio.Semaphore(self.max_concurrent_per_provider)
+        
+        async with self._http_session() as session, semaphore:
+            for attempt in range(self.max_key_attempts):
+                await self._rate_limit(provider)
+                response = await session.request(method, url, **request_kwargs)
+                if response.status in (403, 429) and attempt + 1 < self.max_key_attempts:
+                    next_key = self.get_next_api_key(provider)
+                    if next_key and next_key != api_key:
+                        response.release()
+                        logger.warning(f"🔄 {provider}: HTTP {response.status}, tentando com outra chave")
+                        api_key = next_key
+                        request_kwargs[section] = {
+                            **request_kwargs.get(section, {}),
+                            field: template.format(key=next_key)
+                        }
+                        continue
+                try:
+                    yield response
+                finally:
+                    response.release()
+                return
+
+    async def _rate_limit(self, provider: str):
+        """Aguarda o token bucket do provedor antes de uma requisição"""
+        bucket = self._buckets.get(provider)
+        if bucket is not None:
+            await bucket.acquire()
+
+    @asynccontextmanager
+    async def _http_session(self):
+        """Fornece a sessão HTTP compartilhada (pool keep-alive) da busca atual
+        
+        Reutiliza a sessão aberta por uma chamada externa; se não houver,
+        cria uma com pool de conexões e a fecha ao final.
+        """
+        session = _current_http_session.get()
+        if session is not None and not session.closed:
+            yield session
+            return
+        
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=100,
+                limit_per_host=20,
+                ttl_dns_cache=300,
+                keepalive_timeout=60
+            ),
+            timeout=aiohttp.ClientTimeout(total=30)
+        )
+        token = _current_http_session.set(session)
+        slots_token = _current_provider_slots.set({})
+        try:
+            yield session
+        finally:
+            _current_provider_slots.reset(slots_token)
+            _current_http_session.reset(token)
+            await session.close()
 
     def get_next_api_key(self, provider: str) -> Optional[str]:
         """Obtém próxima chave de API com rotação automática (usa novo sistema)"""
@@ -133,7 +446,7 @@ class RealSearchOrchestrator:
     ) -> Dict[str, Any]:
         """Executa coleta massiva de dados com integração completa"""
         logger.info(f"🚀 INICIANDO COLETA MASSIVA COMPLETA para: {query}")
-        start_time = time.time()
+        start_time = time.monotonic()
 
         # Estrutura de dados consolidados
         massive_data = {
@@ -158,60 +471,29 @@ class RealSearchOrchestrator:
         }
 
         try:
-            # FASE 1: Busca REAL massiva com todos os provedores
-            logger.info("🔍 FASE 1: Executando busca REAL massiva...")
-            search_results = await self.execute_massive_real_search(query, context, session_id)
+            # FASES 1-4: fontes independentes, executadas em paralelo
+            logger.info("🔍 FASES 1-4: Busca web, TrendFinder, Supadata e redes sociais em paralelo...")
+            search_results, trends_results, supadata_results, social_results = await asyncio.gather(
+                self.execute_massive_real_search(query, context, session_id),
+                self._collect_trends(query),
+                self._collect_supadata(query),
+                self._collect_social_media(query),
+                return_exceptions=True
+            )
+            if isinstance(search_results, Exception):
+                raise search_results
             massive_data["web_search_data"] = search_results
 
-            # FASE 2: Coleta de Tendências via TrendFinder MCP
-            logger.info("📈 FASE 2: Coletando tendências via TrendFinder...")
-            if trendfinder_client.is_available():
-                trends_results = await trendfinder_client.search(query)
-                massive_data["trends_data"] = trends_results
-            else:
-                logger.warning("⚠️ TrendFinder não disponível")
-                massive_data["trends_data"] = {"success": False, "error": "TrendFinder não configurado"}
-
-            # FASE 3: Dados Sociais via Supadata MCP
-            logger.info("📊 FASE 3: Coletando dados sociais via Supadata...")
-            if supadata_client.is_available():
-                supadata_results = await supadata_client.search(query, "all")
-                massive_data["supadata_results"] = supadata_results
-            else:
-                logger.warning("⚠️ Supadata não disponível")
-                massive_data["supadata_results"] = {"success": False, "error": "Supadata não configurado"}
+            if isinstance(trends_results, Exception):
+                logger.error(f"❌ Erro no TrendFinder: {trends_results}")
+                trends_results = {"success": False, "error": str(trends_results)}
+            massive_data["trends_data"] = trends_results
+
+            if isinstance(supadata_results, Exception):
+                logger.error(f"❌ Erro no Supadata: {supadata_results}")
+                supadata_results = {"success": False, "error": str(supadata_results)}
+            massive_data["supadata_results"] = supadata_results
 
-            # FASE 4: Extração de Redes Sociais (método existente como fallback)
-            logger.info("📱 FASE 4: Extraindo dados de redes sociais (fallback)...")
-            try:
-                # Usa método existente do social_media_extractor
-                social_results = social_media_extractor.search_all_platforms(query, 15)
-                
-                # Adapta formato para compatibilidade
-                if social_results.get("success"):
-                    social_results = {
-                        "success": True,
-                        "all_platforms_data": social_results,
-                        "total_posts": social_results.get("total_results", 0),
-                        "platforms_analyzed": len(social_results.get("platforms", [])),
-                        "extracted_at": datetime.now().isoformat()
-                    }
-                else:
-                    social_results = {
-                        "success": False,
-                        "error": "Falha na extração de redes sociais",
-                        "all_platforms_data": {"platforms": {}},
-                        "total_posts": 0
-                    }
-            except Exception as social_error:
-                logger.error(f"❌ Erro na extração social: {social_error}")
-                social_results = {
-                    "success": False,
-                    "error": str(social_error),
-                    "all_platforms_data": {"platforms": {}},
-                    "total_posts": 0
-                }
-                
             massive_data["social_media_data"] = social_results
 
             # FASE 5: Seleção de URLs Relevantes
@@ -246,6 +528,7 @@ class RealSearchOrchestrator:
                 all_results.extend(search_results["web_results"])
 
             # Processa resultados sociais existentes - CORRIGIDO
+            web_count = len(all_results)
             if social_results.get("all_platforms_data"):
                 platforms = social_results["all_platforms_data"].get("platforms", {})
                 
@@ -265,6 +548,8 @@ class RealSearchOrchestrator:
                             platform_results = platform_data.get("data", {}).get("results", [])
                             all_results.extend(platform_results)
 
+            social_count = len(all_results) - web_count
+
             # Processa tendências do TrendFinder
             if massive_data["trends_data"].get("success"):
                 trends = massive_data["trends_data"].get("trends", [])
@@ -278,16 +563,17 @@ class RealSearchOrchestrator:
             massive_data["extracted_content"] = all_results
 
             # Calcula estatísticas finais
-            collection_time = time.time() - start_time
+            collection_time = time.monotonic() - start_time
             total_sources = len(all_results)
             total_content = sum(len(str(item)) for item in all_results)
 
             # Atualiza estatísticas com informações dos novos serviços
+            search_statistics = search_results.get("statistics", {})
             sources_by_type = {
-                "web_search_intercalado": search_results.get("statistics", {}).get("total_sources", 0),
-                "social_media_fallback": self._count_social_results(social_results),
-                "trendfinder_mcp": len(massive_data["trends_data"].get("trends", [])),
-                "supadata_mcp": massive_data["supadata_results"].get("total_results", 0),
+                "web_search_intercalado": search_statistics.get("total_sources", 0),
+                "social_media_fallback": social_count,
+                "trendfinder_mcp": len(trends_results.get("trends", [])),
+                "supadata_mcp": supadata_results.get("total_results", 0),
                 "screenshots": massive_data["statistics"]["screenshot_count"]
             }
 
@@ -296,7 +582,7 @@ class RealSearchOrchestrator:
                 "total_content_length": total_content,
                 "collection_time": collection_time,
                 "sources_by_type": sources_by_type,
-                "api_rotations": search_results.get("statistics", {}).get("api_calls_made", 0)
+                "api_rotations": search_statistics.get("api_calls_made", 0)
             })
 
             # Gera relatório de coleta com referências às imagens
@@ -317,29 +603,58 @@ class RealSearchOrchestrator:
             salvar_erro("massive_data_collection", e, contexto={"query": query, "session_id": session_id})
             return {"error": "Falha na coleta massiva de dados", "details": str(e)}
 
-    def _count_social_results(self, social_results: Dict[str, Any]) -> int:
-        """Conta resultados sociais de forma segura"""
+    async def _collect_trends(self, query: str) -> Dict[str, Any]:
+        """FASE 2: Coleta de Tendências via TrendFinder MCP"""
+        logger.info("📈 FASE 2: Coletando tendências via TrendFinder...")
+        if not trendfinder_client.is_available():
+            logger.warning("⚠️ TrendFinder não disponível")
+            return {"success": False, "error": "TrendFinder não configurado"}
+        return await self._cached_call(
+            'TRENDFINDER', lambda: trendfinder_client.search(query), query
+        )
+
+    async def _collect_supadata(self, query: str) -> Dict[str, Any]:
+        """FASE 3: Dados Sociais via Supadata MCP"""
+        logger.info("📊 FASE 3: Coletando dados sociais via Supadata...")
+        if not supadata_client.is_available():
+            logger.warning("⚠️ Supadata não disponível")
+            return {"success": False, "error": "Supadata não configurado"}
+        return await self._cached_call(
+            'SUPADATA_MCP', lambda: supadata_client.search(query, "all"), query, "all"
+        )
+
+    async def _collect_social_media(self, query: str) -> Dict[str, Any]:
+        """FASE 4: Extração de Redes Sociais (método existente como fallback)"""
+        logger.info("📱 FASE 4: Extraindo dados de redes sociais (fallback)...")
         try:
-            platforms = social_results.get("all_platforms_data", {}).get("platforms", {})
-            total_count = 0
-            
-            if isinstance(platforms, dict):
-                for data in platforms.values():
-                    if isinstance(data, dict) and "results" in data:
-                        total_count += len(data["results"])
-            elif isinstance(platforms, list):
-                for platform_data in platforms:
-                    if isinstance(platform_data, dict):
-                        if "results" in platform_data:
-                            total_count += len(platform_data["results"])
-                        elif "data" in platform_data and isinstance(platform_data["data"], dict):
-                            results = platform_data["data"].get("results", [])
-                            total_count += len(results)
+            # Usa método existente do social_media_extractor (síncrono, fora do event loop)
+            social_results = await asyncio.to_thread(
+                social_media_extractor.search_all_platforms, query, 15
+            )
             
-            return total_count
-        except Exception as e:
-            logger.error(f"Erro ao contar resultados sociais: {e}")
-            return 0
+            # Adapta formato para compatibilidade
+            if social_results.get("success"):
+                return {
+                    "success": True,
+                    "all_platforms_data": social_results,
+                    "total_posts": social_results.get("total_results", 0),
+                    "platforms_analyzed": len(social_results.get("platforms", [])),
+                    "extracted_at": datetime.now().isoformat()
+                }
+            return {
+                "success": False,
+                "error": "Falha na extração de redes sociais",
+                "all_platforms_data": {"platforms": {}},
+                "total_posts": 0
+            }
+        except Exception as social_error:
+            logger.error(f"❌ Erro na extração social: {social_error}")
+            return {
+                "success": False,
+                "error": str(social_error),
+                "all_platforms_data": {"platforms": {}},
+                "total_posts": 0
+            }
 
     async def execute_massive_real_search(
         self, 
@@ -348,8 +663,19 @@ class RealSearchOrchestrator:
         session_id: str
     ) -> Dict[str, Any]:
         """Executa busca REAL massiva com todos os provedores"""
+        # Uma única sessão HTTP (conexões reaproveitadas) para todos os provedores
+        async with self._http_session():
+            return await self._execute_massive_real_search(query, context, session_id)
+
+    async def _execute_massive_real_search(
+        self, 
+        query: str, 
+        context: Dict[str, Any],
+        session_id: str
+    ) -> Dict[str, Any]:
+        """Executa as fases da busca massiva (usa a sessão HTTP do contexto)"""
         logger.info(f"🚀 INICIANDO BUSCA REAL MASSIVA para: {query}")
-        start_time = time.time()
+        start_time = time.monotonic()
         # Estrutura de resultados
         search_results = {
             'query': query,
@@ -369,52 +695,67 @@ class RealSearchOrchestrator:
                 'search_duration': 0
             }
         }
+        # URLs já incluídas: provedores costumam repetir os mesmos resultados
+        seen_urls = set()
+
+        def add_web_results(results: List[Dict[str, Any]]):
+            for r in results:
+                url = r.get('url')
+                if url:
+                    if url in seen_urls:
+                        continue
+                    seen_urls.add(url)
+                search_results['web_results'].append(r)
+
         try:
+            # FASES 1-3 são iniciadas juntas; os resultados são incorporados por prioridade
             # FASE 1: Busca com Alibaba WebSailor (prioritária)
             logger.info("🔍 FASE 1: Busca com Alibaba WebSailor")
-            websailor_results = await self._search_alibaba_websailor(query, context)
-            if websailor_results.get('success'):
-                search_results['web_results'].extend(websailor_results['results'])
-                search_results['providers_used'].append('ALIBABA_WEBSAILOR')
-                logger.info(f"✅ Alibaba WebSailor retornou {len(websailor_results['results'])} resultados")
+            websailor_task = asyncio.create_task(self._search_alibaba_websailor(query, context))
             # FASE 2: Busca Web Massiva Simultânea (provedores restantes)
             logger.info("🌐 FASE 2: Busca web massiva simultânea")
-            web_tasks = []
-            # Firecrawl
-            if 'FIRECRAWL' in self.api_keys:
-                web_tasks.append(self._search_firecrawl(query))
-            # Jina
-            if 'JINA' in self.api_keys:
-                web_tasks.append(self._search_jina(query))
-            # Google
-            if 'GOOGLE' in self.api_keys:
-                web_tasks.append(self._search_google(query))
-            # Exa
-            if 'EXA' in self.api_keys:
-                web_tasks.append(self._search_exa(query))
-            # Serper
-            if 'SERPER' in self.api_keys:
-                web_tasks.append(self._search_serper(query))
-            # Executa todas as buscas web simultaneamente
-            if web_tasks:
-                web_results = await asyncio.gather(*web_tasks, return_exceptions=True)
-                for result in web_results:
-                    if isinstance(result, Exception):
-                        logger.error(f"❌ Erro na busca web: {result}")
-                        continue
-                    if result.get('success') and result.get('results'):
-                        search_results['web_results'].extend(result['results'])
-                        search_results['providers_used'].append(result.get('provider', 'unknown'))
-            # FASE 3: Busca em Redes Sociais
+            # Firecrawl, Jina, Google, Exa e Serper (apenas os com chave configurada)
+            web_tasks = [
+                asyncio.create_task(self._with_timeout(provider, search(query)))
+                for provider, search in self._web_searchers
+            ]
+            # FASE 3: Busca em Redes Sociais (independe da web, roda em paralelo à FASE 2)
             logger.info("📱 FASE 3: Busca massiva em redes sociais")
             social_tasks = []
             # YouTube
-            if 'YOUTUBE' in self.api_keys:
-                social_tasks.append(self._search_youtube(query))
+            if 'YOUTUBE' in self.available_providers:
+                social_tasks.append(asyncio.create_task(
+                    self._with_timeout('YOUTUBE', self._search_youtube(query))
+                ))
+            # X/Twitter
+            if 'X' in self.available_providers:
+                social_tasks.append(asyncio.create_task(
+                    self._with_timeout('X', self._search_twitter(query))
+                ))
             # Supadata (Instagram, Facebook, TikTok)
             # if 'SUPADATA' in self.api_keys:
             #     social_tasks.append(self._search_supadata(query))
-            # Executa buscas sociais
+            # WebSailor primeiro, para manter sua prioridade na deduplicação de URLs
+            try:
+                websailor_results = await websailor_task
+            except Exception as e:
+                logger.error(f"❌ Erro Alibaba WebSailor: {e}")
+                websailor_results = {'success': False, 'error': str(e)}
+            if websailor_results.get('success'):
+                add_web_results(websailor_results['results'])
+                search_results['providers_used'].append('ALIBABA_WEBSAILOR')
+                logger.info(f"✅ Alibaba WebSailor retornou {len(websailor_results['results'])} resultados")
+            # Incorpora cada provedor web assim que ele termina
+            for next_result in asyncio.as_completed(web_tasks):
+                try:
+                    result = await next_result
+                except Exception as e:
+                    logger.error(f"❌ Erro na busca web: {e}")
+                    continue
+                if result.get('success') and result.get('results'):
+                    add_web_results(result['results'])
+                    search_results['providers_used'].append(result.get('provider', 'unknown'))
+            # Aguarda buscas sociais
             if social_tasks:
                 social_results = await asyncio.gather(*social_tasks, return_exceptions=True)
                 for result in social_results:
@@ -439,13 +780,20 @@ class RealSearchOrchestrator:
                 search_results['screenshots_captured'] = screenshots
                 self.session_stats['screenshots_captured'] = len(screenshots)
             # Calcula estatísticas finais
-            search_duration = time.time() - start_time
+            search_duration = time.monotonic() - start_time
             all_results = search_results['web_results'] + search_results['social_results'] + search_results['youtube_results']
-            unique_urls = list(set(r.get('url', '') for r in all_results if r.get('url')))
+            # URLs únicas e volume de conteúdo numa única passada
+            unique_urls = set()
+            content_extracted = 0
+            for r in all_results:
+                url = r.get('url')
+                if url:
+                    unique_urls.add(url)
+                content_extracted += len(r.get('content', ''))
             search_results['statistics'].update({
                 'total_sources': len(all_results),
                 'unique_urls': len(unique_urls),
-                'content_extracted': sum(len(r.get('content', '')) for r in all_results),
+                'content_extracted': content_extracted,
                 'api_calls_made': sum(self.session_stats['api_rotations'].values()),
                 'search_duration': search_duration
             })
@@ -457,6 +805,7 @@ class RealSearchOrchestrator:
             logger.error(f"❌ ERRO CRÍTICO na busca massiva: {e}")
             raise
 
+    @_cached_result('ALIBABA_WEBSAILOR')
     async def _search_alibaba_websailor(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """Busca REAL usando Alibaba WebSailor Agent"""
         try:
@@ -501,6 +850,7 @@ class RealSearchOrchestrator:
             logger.error(f"❌ Erro Alibaba WebSailor: {e}")
             return {'success': False, 'error': str(e)}
 
+    @_cached_result('FIRECRAWL')
     async def _search_firecrawl(self, query: str) -> Dict[str, Any]:
         """Busca REAL usando Firecrawl"""
         try:
@@ -509,7 +859,7 @@ class RealSearchOrchestrator:
                 return {'success': False, 'error': 'Firecrawl API key não disponível'}
             # Busca no Google e extrai com Firecrawl
             search_url = f"https://www.google.com/search?q={quote_plus(query)}&hl=pt-BR&gl=BR"
-            async with aiohttp.ClientSession() as session:
+            async with self._http_session() as session:
                 headers = {
                     'Authorization': f'Bearer {api_key}',
                     'Content-Type': 'application/json'
@@ -522,14 +872,16 @@ class RealSearchOrchestrator:
                     'excludeTags': ['nav', 'footer', 'aside', 'script'],
                     'waitFor': 3000
                 }
-                async with session.post(
-                    self.service_urls['FIRECRAWL'],
+                async with self._provider_request(
+                    'FIRECRAWL', 'POST', self.provider_configs['FIRECRAWL'].url,
+                    api_key=api_key,
+                    key_field=('headers', 'Authorization', 'Bearer {key}'),
                     json=payload,
                     headers=headers,
                     timeout=30
                 ) as response:
                     if response.status == 200:
-                        data = await response.json()
+                        data = await _read_json(response)
                         content = data.get('data', {}).get('markdown', '')
                         # Extrai resultados do conteúdo
                         results = self._extract_search_results_from_content(content, 'firecrawl')
@@ -547,6 +899,7 @@ class RealSearchOrchestrator:
             logger.error(f"❌ Erro Firecrawl: {e}")
             return {'success': False, 'error': str(e)}
 
+    @_cached_result('JINA')
     async def _search_jina(self, query: str) -> Dict[str, Any]:
         """Busca REAL usando Jina AI"""
         try:
@@ -559,27 +912,37 @@ class RealSearchOrchestrator:
                 f"https://www.bing.com/search?q={quote_plus(query)}&cc=br",
                 f"https://search.yahoo.com/search?p={quote_plus(query)}&ei=UTF-8"
             ]
+            headers = {
+                'Authorization': f'Bearer {api_key}',
+                'Accept': 'text/plain'
+            }
             results = []
-            async with aiohttp.ClientSession() as session:
-                for search_url in search_urls:
+            async with self._http_session() as session:
+                async def fetch_one(search_url: str) -> List[Dict[str, Any]]:
                     try:
-                        jina_url = f"{self.service_urls['JINA']}{search_url}"
-                        headers = {
-                            'Authorization': f'Bearer {api_key}',
-                            'Accept': 'text/plain'
-                        }
-                        async with session.get(
-                            jina_url,
+                        jina_url = f"{self.provider_configs['JINA'].url}{search_url}"
+                        async with self._provider_request(
+                            'JINA', 'GET', jina_url,
+                            api_key=api_key,
+                            key_field=('headers', 'Authorization', 'Bearer {key}'),
                             headers=headers,
                             timeout=30
                         ) as response:
                             if response.status == 200:
                                 content = await response.text()
-                                extracted_results = self._extract_search_results_from_content(content, 'jina')
-                                results.extend(extracted_results)
+                                return self._extract_search_results_from_content(content, 'jina')
                     except Exception as e:
                         logger.warning(f"⚠️ Erro em URL Jina {search_url}: {e}")
-                        continue
+                    return []
+
+                # Os três buscadores são consultados em paralelo
+                fetched = await asyncio.gather(
+                    *(fetch_one(search_url) for search_url in search_urls),
+                    return_exceptions=True
+                )
+                for extracted_results in fetched:
+                    if not isinstance(extracted_results, Exception):
+                        results.extend(extracted_results)
             return {
                 'success': True,
                 'provider': 'JINA',
@@ -589,6 +952,7 @@ class RealSearchOrchestrator:
             logger.error(f"❌ Erro Jina: {e}")
             return {'success': False, 'error': str(e)}
 
+    @_cached_result('GOOGLE')
     async def _search_google(self, query: str) -> Dict[str, Any]:
         """Busca REAL usando Google Custom Search"""
         try:
@@ -596,7 +960,7 @@ class RealSearchOrchestrator:
             cse_id = os.getenv('GOOGLE_CSE_ID')
             if not api_key or not cse_id:
                 return {'success': False, 'error': 'Google API não configurada'}
-            async with aiohttp.ClientSession() as session:
+            async with self._http_session() as session:
                 params = {
                     'key': api_key,
                     'cx': cse_id,
@@ -607,13 +971,15 @@ class RealSearchOrchestrator:
                     'safe': 'off',
                     'dateRestrict': 'm6'
                 }
-                async with session.get(
-                    self.service_urls['GOOGLE'],
+                async with self._provider_request(
+                    'GOOGLE', 'GET', self.provider_configs['GOOGLE'].url,
+                    api_key=api_key,
+                    key_field=('params', 'key', '{key}'),
                     params=params,
                     timeout=30
                 ) as response:
                     if response.status == 200:
-                        data = await response.json()
+                        data = await _read_json(response)
                         results = []
                         for item in data.get('items', []):
                             results.append({
@@ -637,13 +1003,14 @@ class RealSearchOrchestrator:
             logger.error(f"❌ Erro Google: {e}")
             return {'success': False, 'error': str(e)}
 
+    @_cached_result('YOUTUBE')
     async def _search_youtube(self, query: str) -> Dict[str, Any]:
         """Busca REAL no YouTube com foco em conteúdo viral"""
         try:
             api_key = self.get_next_api_key('YOUTUBE')
             if not api_key:
                 return {'success': False, 'error': 'YouTube API key não disponível'}
-            async with aiohttp.ClientSession() as session:
+            async with self._http_session() as session:
                 params = {
                     'part': "snippet,id",
                     'q': f"{query} Brasil",
@@ -655,19 +1022,23 @@ class RealSearchOrchestrator:
                     'relevanceLanguage': 'pt',
                     'publishedAfter': '2023-01-01T00:00:00Z'
                 }
-                async with session.get(
-                    self.service_urls['YOUTUBE'],
+                async with self._provider_request(
+                    'YOUTUBE', 'GET', self.provider_configs['YOUTUBE'].url,
+                    api_key=api_key,
+                    key_field=('params', 'key', '{key}'),
                     params=params,
                     timeout=30
                 ) as response:
                     if response.status == 200:
-                        data = await response.json()
+                        data = await _read_json(response)
                         results = []
-                        for item in data.get('items', []):
+                        items = data.get('items', [])
+                        video_ids = [item.get('id', {}).get('videoId', '') for item in items]
+                        # Busca estatísticas detalhadas de todos os vídeos numa única chamada
+                        stats_by_id = await self._get_youtube_stats_bulk(video_ids, api_key)
+                        for item, video_id in zip(items, video_ids):
                             snippet = item.get('snippet', {})
-                            video_id = item.get('id', {}).get('videoId', '')
-                            # Busca estatísticas detalhadas
-                            stats = await self._get_youtube_video_stats(video_id, api_key, session)
+                            stats = stats_by_id.get(video_id, {})
                             results.append({
                                 'title': snippet.get('title', ''),
                                 'url': f"https://www.youtube.com/watch?v={video_id}",
@@ -697,36 +1068,55 @@ class RealSearchOrchestrator:
             logger.error(f"❌ Erro YouTube: {e}")
             return {'success': False, 'error': str(e)}
 
-    async def _get_youtube_video_stats(self, video_id: str, api_key: str, session: aiohttp.ClientSession) -> Dict[str, Any]:
-        """Obtém estatísticas detalhadas de um vídeo do YouTube"""
-        try:
+    async def _get_youtube_stats_bulk(self, video_ids: List[str], api_key: str) -> Dict[str, Dict[str, Any]]:
+        """Obtém estatísticas de vários vídeos do YouTube (até 50 IDs por requisição)"""
+        video_ids = [video_id for video_id in video_ids if video_id]
+        if not video_ids:
+            return {}
+
+        async def fetch_batch(batch: List[str]) -> Dict[str, Dict[str, Any]]:
             params = {
                 'part': 'statistics',
-                'id': video_id,
+                'id': ','.join(batch),
                 'key': api_key
             }
-            async with session.get(
-                'https://www.googleapis.com/youtube/v3/videos',
-                params=params,
-                timeout=10
-            ) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    items = data.get('items', [])
-                    if items:
-                        return items[0].get('statistics', {})
-                return {}
-        except Exception as e:
-            logger.warning(f"⚠️ Erro ao obter stats do vídeo {video_id}: {e}")
-            return {}
+            async with self._http_session() as session:
+                async with self._provider_request(
+                    'YOUTUBE', 'GET', 'https://www.googleapis.com/youtube/v3/videos',
+                    api_key=api_key,
+                    key_field=('params', 'key', '{key}'),
+                    params=params,
+                    timeout=10
+                ) as response:
+                    if response.status == 200:
+                        data = await _read_json(response)
+                        return {
+                            item.get('id'): item.get('statistics', {})
+                            for item in data.get('items', [])
+                        }
+                    logger.warning(f"⚠️ YouTube stats erro {response.status}")
+                    return {}
 
+        batches = await asyncio.gather(
+            *(fetch_batch(video_ids[i:i + 50]) for i in range(0, len(video_ids), 50)),
+            return_exceptions=True
+        )
+        stats_by_id = {}
+        for batch in batches:
+            if isinstance(batch, Exception):
+                logger.warning(f"⚠️ Erro ao obter stats dos vídeos: {batch}")
+                continue
+            stats_by_id.update(batch)
+        return stats_by_id
+
+    @_cached_result('SUPADATA')
     async def _search_supadata(self, query: str) -> Dict[str, Any]:
         """Busca REAL usando Supadata MCP"""
         try:
             api_key = self.get_next_api_key('SUPADATA')
             if not api_key:
                 return {'success': False, 'error': 'Supadata API key não disponível'}
-            async with aiohttp.ClientSession() as session:
+            async with self._http_session() as session:
                 headers = {
                     'Authorization': f'Bearer {api_key}',
                     'Content-Type': 'application/json'
@@ -741,14 +1131,16 @@ class RealSearchOrchestrator:
                         'include_metrics': True
                     }
                 }
-                async with session.post(
-                    self.service_urls['SUPADATA'],
+                async with self._provider_request(
+                    'SUPADATA', 'POST', self.provider_configs['SUPADATA'].url,
+                    api_key=api_key,
+                    key_field=('headers', 'Authorization', 'Bearer {key}'),
                     json=payload,
                     headers=headers,
                     timeout=45
                 ) as response:
                     if response.status == 200:
-                        data = await response.json()
+                        data = await _read_json(response)
                         results = []
                         posts = data.get('result', {}).get('posts', [])
                         for post in posts:
@@ -779,13 +1171,14 @@ class RealSearchOrchestrator:
             logger.error(f"❌ Erro Supadata: {e}")
             return {'success': False, 'error': str(e)}
 
+    @_cached_result('X')
     async def _search_twitter(self, query: str) -> Dict[str, Any]:
         """Busca REAL no Twitter/X"""
         try:
             api_key = self.get_next_api_key('X')
             if not api_key:
                 return {'success': False, 'error': 'X API key não disponível'}
-            async with aiohttp.ClientSession() as session:
+            async with self._http_session() as session:
                 headers = {
                     'Authorization': f'Bearer {api_key}',
                     'Content-Type': 'application/json'
@@ -797,14 +1190,16 @@ class RealSearchOrchestrator:
                     'user.fields': 'username,verified,public_metrics',
                     'expansions': 'author_id'
                 }
-                async with session.get(
-                    'https://api.twitter.com/2/tweets/search/recent',
+                async with self._provider_request(
+                    'X', 'GET', self.provider_configs['X'].url,
+                    api_key=api_key,
+                    key_field=('headers', 'Authorization', 'Bearer {key}'),
                     params=params,
                     headers=headers,
                     timeout=30
                 ) as response:
                     if response.status == 200:
-                        data = await response.json()
+                        data = await _read_json(response)
                         results = []
                         tweets = data.get('data', [])
                         users = {user['id']: user for user in data.get('includes', {}).get('users', [])}
@@ -839,13 +1234,14 @@ class RealSearchOrchestrator:
             logger.error(f"❌ Erro X/Twitter: {e}")
             return {'success': False, 'error': str(e)}
 
+    @_cached_result('EXA')
     async def _search_exa(self, query: str) -> Dict[str, Any]:
         """Busca REAL usando Exa Neural Search"""
         try:
             api_key = self.get_next_api_key('EXA')
             if not api_key:
                 return {'success': False, 'error': 'Exa API key não disponível'}
-            async with aiohttp.ClientSession() as session:
+            async with self._http_session() as session:
                 headers = {
                     'x-api-key': api_key,
                     'Content-Type': 'application/json'
@@ -861,14 +1257,16 @@ class RealSearchOrchestrator:
                     ],
                     'startPublishedDate': '2023-01-01'
                 }
-                async with session.post(
-                    self.service_urls['EXA'],
+                async with self._provider_request(
+                    'EXA', 'POST', self.provider_configs['EXA'].url,
+                    api_key=api_key,
+                    key_field=('headers', 'x-api-key', '{key}'),
                     json=payload,
                     headers=headers,
                     timeout=30
                 ) as response:
                     if response.status == 200:
-                        data = await response.json()
+                        data = await _read_json(response)
                         results = []
                         for item in data.get('results', []):
                             results.append({
@@ -893,13 +1291,14 @@ class RealSearchOrchestrator:
             logger.error(f"❌ Erro Exa: {e}")
             return {'success': False, 'error': str(e)}
 
+    @_cached_result('SERPER')
     async def _search_serper(self, query: str) -> Dict[str, Any]:
         """Busca REAL usando Serper"""
         try:
             api_key = self.get_next_api_key('SERPER')
             if not api_key:
                 return {'success': False, 'error': 'Serper API key não disponível'}
-            async with aiohttp.ClientSession() as session:
+            async with self._http_session() as session:
                 headers = {
                     'X-API-KEY': api_key,
                     'Content-Type': 'application/json'
@@ -911,14 +1310,16 @@ class RealSearchOrchestrator:
                     'num': 15,
                     'autocorrect': True
                 }
-                async with session.post(
-                    self.service_urls['SERPER'],
+                async with self._provider_request(
+                    'SERPER', 'POST', self.provider_configs['SERPER'].url,
+                    api_key=api_key,
+                    key_field=('headers', 'X-API-KEY', '{key}'),
                     json=payload,
                     headers=headers,
                     timeout=30
                 ) as response:
                     if response.status == 200:
-                        data = await response.json()
+                        data = await _read_json(response)
                         results = []
                         for item in data.get('organic', []):
                             results.append({
@@ -944,24 +1345,27 @@ class RealSearchOrchestrator:
 
     def _extract_search_results_from_content(self, content: str, provider: str) -> List[Dict[str, Any]]:
         """Extrai resultados de busca do conteúdo extraído"""
+        max_results = 15  # Máximo 15 por provedor
         results = []
         if not content:
             return results
         # Divide o conteúdo em seções
-        lines = content.split('\n')
         current_result = {}
-        for line in lines:
+        for line in content.split('\n'):
             line = line.strip()
             if not line:
                 continue
+            is_url = line.startswith(('http', 'www'))
             # Detecta títulos (linhas com mais de 20 caracteres e sem URLs)
             if (len(line) > 20 and 
-                not line.startswith('http') and 
-                not line.startswith('www') and
-                '.' not in line[:10]):
+                not is_url and
+                line.find('.', 0, 10) == -1):
                 # Salva resultado anterior se existir
                 if current_result.get('title'):
                     results.append(current_result)
+                    # Limite atingido: o restante do conteúdo seria descartado
+                    if len(results) >= max_results:
+                        return results
                 # Inicia novo resultado
                 current_result = {
                     'title': line,
@@ -971,108 +1375,213 @@ class RealSearchOrchestrator:
                     'relevance_score': 0.7
                 }
             # Detecta URLs
-            elif line.startswith(('http', 'www')):
+            elif is_url:
                 if current_result:
                     current_result['url'] = line
             # Detecta descrições (linhas médias)
             elif 50 <= len(line) <= 200 and current_result:
                 current_result['snippet'] = line
-        # Adiciona último resultado
+        # Adiciona último resultado (títulos têm sempre mais de 20 caracteres)
         if current_result.get('title'):
             results.append(current_result)
-        # Filtra resultados válidos
-        valid_results = [r for r in results if r.get('title') and len(r.get('title', '')) > 10]
-        return valid_results[:15]  # Máximo 15 por provedor
+        return results[:max_results]
 
     def _identify_viral_content(self, all_social_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Identifica conteúdo viral para captura de screenshots"""
         if not all_social_results:
             return []
-        # Ordena por score viral
-        sorted_content = sorted(
-            all_social_results, 
-            key=lambda x: x.get('viral_score', 0), 
-            reverse=True
-        )
-        # Seleciona top 10 conteúdos virais
-        viral_content = []
-        seen_urls = set()
-        for content in sorted_content:
+        # Mantém por URL o conteúdo de maior score viral (o primeiro em caso de empate)
+        best_by_url = {}
+        for index, content in enumerate(all_social_results):
             url = content.get('url', '')
-            if url and url not in seen_urls and len(viral_content) < 10:
-                viral_content.append(content)
-                seen_urls.add(url)
+            if not url:
+                continue
+            score = content.get('viral_score', 0)
+            best = best_by_url.get(url)
+            if best is None or score > best[0]:
+                best_by_url[url] = (score, -index, content)
+        # Seleciona top 10 conteúdos virais sem ordenar a lista inteira
+        viral_content = [
+            content for _, _, content in heapq.nlargest(
+                10, best_by_url.values(), key=lambda entry: entry[:2]
+            )
+        ]
         logger.info(f"🔥 {len(viral_content)} conteúdos virais identificados")
         return viral_content
 
     async def _capture_viral_screenshots(self, viral_content: List[Dict[str, Any]], session_id: str) -> List[Dict[str, Any]]:
-        """Captura screenshots do conteúdo viral usando Selenium"""
-        screenshots = []
-        try:
-            from selenium import webdriver
-            from selenium.webdriver.chrome.options import Options
-            from selenium.webdriver.chrome.service import Service
-            from selenium.webdriver.common.by import By
-            from selenium.webdriver.support.ui import WebDriverWait
-            from selenium.webdriver.support import expected_conditions as EC
-            from webdriver_manager.chrome import ChromeDriverManager
-            # Configura Chrome em modo headless
-            chrome_options = Options()
-            chrome_options.add_argument("--headless")
-            chrome_options.add_argument("--no-sandbox")
-            chrome_options.add_argument("--disable-dev-shm-usage")
-            chrome_options.add_argument("--window-size=1920,1080")
-            chrome_options.add_argument("--disable-gpu")
-            service = Service(ChromeDriverManager().install())
-            driver = webdriver.Chrome(service=service, options=chrome_options)
-            # Cria diretório para screenshots
-            screenshots_dir = f"analyses_data/files/{session_id}"
-            os.makedirs(screenshots_dir, exist_ok=True)
+        """Captura screenshots do conteúdo viral (Playwright, com Selenium como fallback)"""
+        if HAS_PLAYWRIGHT:
             try:
-                for i, content in enumerate(viral_content, 1):
+                return await self._capture_viral_screenshots_playwright(viral_content, session_id)
+            except Exception as e:
+                logger.warning(f"⚠️ Playwright falhou, usando Selenium: {e}")
+        return await self._capture_viral_screenshots_selenium(viral_content, session_id)
+
+    async def _capture_viral_screenshots_playwright(self, viral_content: List[Dict[str, Any]], session_id: str) -> List[Dict[str, Any]]:
+        """Captura screenshots em paralelo com um navegador Playwright e contextos isolados"""
+        screenshots_dir = f"analyses_data/files/{session_id}"
+        os.makedirs(screenshots_dir, exist_ok=True)
+        
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(
+                headless=True,
+                args=['--no-sandbox', '--disable-dev-shm-usage', '--disable-gpu']
+            )
+            semaphore = asyncio.Semaphore(4)
+            
+            async def capture(i: int, content: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+                url = content.get('url', '')
+                if not url:
+                    return None
+                async with semaphore:
+                    context = await browser.new_context(viewport={'width': 1920, 'height': 1080})
                     try:
-                        url = content.get('url', '')
-                        if not url:
-                            continue
                         logger.info(f"📸 Capturando screenshot {i}/10: {content.get('title', 'Sem título')}")
-                        # Acessa a URL
-                        driver.get(url)
-                        # Aguarda carregamento
-                        WebDriverWait(driver, 10).until(
-                            EC.presence_of_element_located((By.TAG_NAME, "body"))
-                        )
-                        # Aguarda renderização completa
-                        time.sleep(3)
-                        # Captura screenshot
+                        page = await context.new_page()
+                        try:
+                            await page.goto(url, wait_until='networkidle', timeout=15000)
+                        except Exception:
+                            # Páginas com tráfego contínuo nunca ficam ociosas: captura o que carregou
+                            logger.debug(f"Tempo de carregamento excedido em {url}, capturando assim mesmo")
                         screenshot_path = f"{screenshots_dir}/viral_content_{i:02d}.png"
-                        driver.save_screenshot(screenshot_path)
-                        # Verifica se foi criado
-                        if os.path.exists(screenshot_path) and os.path.getsize(screenshot_path) > 0:
-                            screenshots.append({
-                                'content_data': content,
-                                'screenshot_path': screenshot_path,
-                                'filename': f"viral_content_{i:02d}.png",
-                                'url': url,
-                                'title': content.get('title', ''),
-                                'platform': content.get('platform', ''),
-                                'viral_score': content.get('viral_score', 0),
-                                'captured_at': datetime.now().isoformat()
-                            })
-                            logger.info(f"✅ Screenshot {i} capturado: {screenshot_path}")
-                        else:
-                            logger.warning(f"⚠️ Falha ao capturar screenshot {i}")
+                        await page.screenshot(path=screenshot_path)
                     except Exception as e:
                         logger.error(f"❌ Erro ao capturar screenshot {i}: {e}")
-                        continue
+                        return None
+                    finally:
+                        await context.close()
+                
+                if os.path.exists(screenshot_path) and os.path.getsize(screenshot_path) > 0:
+                    logger.info(f"✅ Screenshot {i} capturado: {screenshot_path}")
+                    return {
+                        'content_data': content,
+                        'screenshot_path': screenshot_path,
+                        'filename': f"viral_content_{i:02d}.png",
+                        'url': url,
+                        'title': content.get('title', ''),
+                        'platform': content.get('platform', ''),
+                        'viral_score': content.get('viral_score', 0),
+                        'captured_at': datetime.now().isoformat()
+                    }
+                logger.warning(f"⚠️ Falha ao capturar screenshot {i}")
+                return None
+            
+            try:
+                captured = await asyncio.gather(
+                    *(capture(i, content) for i, content in enumerate(viral_content, 1))
+                )
             finally:
+                await browser.close()
+        
+        return [screenshot for screenshot in captured if screenshot]
+
+    def _get_selenium_driver(self):
+        """Retorna o Chrome headless reutilizável, criando-o se necessário"""
+        if self._driver is not None:
+            try:
+                self._driver.current_url  # Verifica se o navegador ainda responde
+                return self._driver
+            except Exception:
+                self._quit_selenium_driver()
+        
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
+        from webdriver_manager.chrome import ChromeDriverManager
+        # Resolve o ChromeDriver uma única vez por processo
+        if RealSearchOrchestrator._chromedriver_path is None:
+            RealSearchOrchestrator._chromedriver_path = ChromeDriverManager().install()
+        # Configura Chrome em modo headless
+        chrome_options = Options()
+        chrome_options.add_argument("--headless")
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        chrome_options.add_argument("--window-size=1920,1080")
+        chrome_options.add_argument("--disable-gpu")
+        service = Service(RealSearchOrchestrator._chromedriver_path)
+        self._driver = webdriver.Chrome(service=service, options=chrome_options)
+        return self._driver
+
+    def _quit_selenium_driver(self):
+        """Encerra o Chrome reutilizável"""
+        driver, self._driver = self._driver, None
+        if driver is not None:
+            try:
                 driver.quit()
-        except ImportError:
-            logger.error("❌ Selenium não instalado - screenshots não disponíveis")
-            return []
-        except Exception as e:
-            logger.error(f"❌ Erro na captura de screenshots: {e}")
-            return []
-        return screenshots
+            except Exception as e:
+                logger.debug(f"Erro ao encerrar o navegador: {e}")
+
+    async def close(self):
+        """Libera recursos mantidos entre sessões (navegador Selenium)"""
+        await asyncio.to_thread(self._quit_selenium_driver)
+
+    async def _capture_viral_screenshots_selenium(self, viral_content: List[Dict[str, Any]], session_id: str) -> List[Dict[str, Any]]:
+        """Captura screenshots do conteúdo viral usando Selenium (em thread, sem bloquear o event loop)"""
+        return await asyncio.to_thread(self._capture_viral_screenshots_selenium_sync, viral_content, session_id)
+
+    def _capture_viral_screenshots_selenium_sync(self, viral_content: List[Dict[str, Any]], session_id: str) -> List[Dict[str, Any]]:
+        """Captura screenshots do conteúdo viral usando Selenium (chamadas bloqueantes)"""
+        # Um único navegador compartilhado: capturas concorrentes são serializadas
+        with self._driver_lock:
+            screenshots = []
+            try:
+                from selenium.webdriver.common.by import By
+                from selenium.webdriver.support.ui import WebDriverWait
+                from selenium.webdriver.support import expected_conditions as EC
+                driver = self._get_selenium_driver()
+                # Cria diretório para screenshots
+                screenshots_dir = f"analyses_data/files/{session_id}"
+                os.makedirs(screenshots_dir, exist_ok=True)
+                try:
+                    for i, content in enumerate(viral_content, 1):
+                        try:
+                            url = content.get('url', '')
+                            if not url:
+                                continue
+                            logger.info(f"📸 Capturando screenshot {i}/10: {content.get('title', 'Sem título')}")
+                            # Acessa a URL
+                            driver.get(url)
+                            # Aguarda carregamento
+                            WebDriverWait(driver, 10).until(
+                                EC.presence_of_element_located((By.TAG_NAME, "body"))
+                            )
+                            # Aguarda renderização completa
+                            time.sleep(3)
+                            # Captura screenshot
+                            screenshot_path = f"{screenshots_dir}/viral_content_{i:02d}.png"
+                            driver.save_screenshot(screenshot_path)
+                            # Verifica se foi criado
+                            if os.path.exists(screenshot_path) and os.path.getsize(screenshot_path) > 0:
+                                screenshots.append({
+                                    'content_data': content,
+                                    'screenshot_path': screenshot_path,
+                                    'filename': f"viral_content_{i:02d}.png",
+                                    'url': url,
+                                    'title': content.get('title', ''),
+                                    'platform': content.get('platform', ''),
+                                    'viral_score': content.get('viral_score', 0),
+                                    'captured_at': datetime.now().isoformat()
+                                })
+                                logger.info(f"✅ Screenshot {i} capturado: {screenshot_path}")
+                            else:
+                                logger.warning(f"⚠️ Falha ao capturar screenshot {i}")
+                        except Exception as e:
+                            logger.error(f"❌ Erro ao capturar screenshot {i}: {e}")
+                            continue
+                finally:
+                    # Mantém o navegador aberto para as próximas sessões, sem estado desta
+                    try:
+                        driver.delete_all_cookies()
+                    except Exception:
+                        self._quit_selenium_driver()
+            except ImportError:
+                logger.error("❌ Selenium não instalado - screenshots não disponíveis")
+                return []
+            except Exception as e:
+                logger.error(f"❌ Erro na captura de screenshots: {e}")
+                return []
+            return screenshots
 
     def _calculate_viral_score(self, stats: Dict[str, Any]) -> float:
         """Calcula score viral para YouTube"""
@@ -1119,13 +1628,18 @@ class RealSearchOrchestrator:
         """Retorna estatísticas da sessão atual"""
         return self.session_stats.copy()
     
+    @staticmethod
+    def _write_report_file(session_dir: str, report_path: str, content: str):
+        """Escrita síncrona do relatório, executada em thread"""
+        os.makedirs(session_dir, exist_ok=True)
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
     async def _generate_collection_report(self, massive_data: Dict[str, Any], session_id: str):
         """Gera um relatório de coleta com referências às imagens capturadas."""
         logger.info(f"📝 Gerando relatório de coleta para sessão: {session_id}")
         
-        # Cria diretório da sessão
         session_dir = f"analyses_data/{session_id}"
-        os.makedirs(session_dir, exist_ok=True)
 
         report_data = {
             "session_id": session_id,
@@ -1146,10 +1660,9 @@ class RealSearchOrchestrator:
         # Gera relatório em Markdown
         markdown_report = self._generate_markdown_report(massive_data, session_id)
         
-        # Salva relatório de coleta
+        # Salva relatório de coleta (cria o diretório da sessão) fora do event loop
         report_path = f"{session_dir}/relatorio_coleta.md"
-        with open(report_path, 'w', encoding='utf-8') as f:
-            f.write(markdown_report)
+        await asyncio.to_thread(self._write_report_file, session_dir, report_path, markdown_report)
         
         logger.info(f"✅ Relatório de coleta salvo: {report_path}")
 
@@ -1184,7 +1697,8 @@ class RealSearchOrchestrator:
     def _generate_markdown_report(self, massive_data: Dict[str, Any], session_id: str) -> str:
         """Gera relatório em formato Markdown"""
         
-        report = f"""# RELATÓRIO DE COLETA DE DADOS - ARQV30 Enhanced v3.0
+        # Partes acumuladas em lista e unidas no final (evita concatenação quadrática)
+        parts = [f"""# RELATÓRIO DE COLETA DE DADOS - ARQV30 Enhanced v3.0
 
 **Sessão:** {session_id}  
 **Query:** {massive_data.get('query', 'N/A')}  
@@ -1202,33 +1716,35 @@ class RealSearchOrchestrator:
 - **APIs Utilizadas:** {len(massive_data.get('statistics', {}).get('api_rotations', {}))}
 
 ### Fontes por Tipo:
-"""
+"""]
         
         # Adiciona estatísticas por tipo
         sources_by_type = massive_data.get('statistics', {}).get('sources_by_type', {})
         # Corrigido: Verifica se sources_by_type é um dicionário antes de iterar
         if isinstance(sources_by_type, dict):
             for source_type, count in sources_by_type.items():
-                report += f"- **{source_type.replace('_', ' ').title()}:** {count}\n"
+                parts.append(f"- **{source_type.replace('_', ' ').title()}:** {count}\n")
         else:
             # Se não for um dicionário, tenta tratá-lo como lista ou outro tipo
-            report += f"- **Dados de fontes:** {sources_by_type}\n"
+            parts.append(f"- **Dados de fontes:** {sources_by_type}\n")
         
-        report += "\n---\n\n"
+        parts.append("\n---\n\n")
         
         # Adiciona dados de busca web
         web_data = massive_data.get('web_search_data', {})
         if web_data.get('web_results'):
-            report += "## DADOS DE BUSCA WEB\n\n"
-            for i, result in enumerate(web_data['web_results'], 1):
-                report += f"**{i}. {result.get('title', 'Sem título')}**  \n"
-                report += f"URL: {result.get('url', 'N/A')}  \n"
-                report += f"Resumo: {result.get('snippet', 'N/A')[:200]}...\n\n"
+            parts.append("## DADOS DE BUSCA WEB\n\n")
+            parts.extend(
+                f"**{i}. {result.get('title', 'Sem título')}**  \n"
+                f"URL: {result.get('url', 'N/A')}  \n"
+                f"Resumo: {result.get('snippet', 'N/A')[:200]}...\n\n"
+                for i, result in enumerate(web_data['web_results'], 1)
+            )
         
         # Adiciona dados sociais
         social_data = massive_data.get('social_media_data', {})
         if social_data.get('success'):
-            report += "## DADOS DE REDES SOCIAIS\n\n"
+            parts.append("## DADOS DE REDES SOCIAIS\n\n")
             platforms = social_data.get('all_platforms_data', {}).get('platforms', {})
             
             # Corrigido: Verifica o tipo de platforms antes de iterar
@@ -1236,10 +1752,10 @@ class RealSearchOrchestrator:
                 for platform, data in platforms.items():
                     results = data.get('results', [])
                     if results:
-                        report += f"### {platform.title()} ({len(results)} posts)\n\n"
+                        parts.append(f"### {platform.title()} ({len(results)} posts)\n\n")
                         for i, post in enumerate(results[:3], 1):
                             title = post.get('title', post.get('text', post.get('caption', 'Post sem título')))
-                            report += f"**{i}.** {title[:100]}...\n\n"
+                            parts.append(f"**{i}.** {title[:100]}...\n\n")
             elif isinstance(platforms, list):
                 # Se for uma lista, processa cada item
                 for i, platform_data in enumerate(platforms):
@@ -1247,34 +1763,34 @@ class RealSearchOrchestrator:
                         platform_name = platform_data.get('platform', f'Platform_{i}')
                         results = platform_data.get('results', [])
                         if results:
-                            report += f"### {platform_name.title()} ({len(results)} posts)\n\n"
+                            parts.append(f"### {platform_name.title()} ({len(results)} posts)\n\n")
                             for j, post in enumerate(results[:3], 1):
                                 title = post.get('title', post.get('text', post.get('caption', 'Post sem título')))
-                                report += f"**{j}.** {title[:100]}...\n\n"
+                                parts.append(f"**{j}.** {title[:100]}...\n\n")
         
         # Adiciona screenshots
         visual_content = massive_data.get('visual_content', {})
         if visual_content.get('success'):
             screenshots = visual_content.get('screenshots', [])
             if screenshots:
-                report += "## EVIDÊNCIAS VISUAIS\n\n"
+                parts.append("## EVIDÊNCIAS VISUAIS\n\n")
                 for i, screenshot in enumerate(screenshots, 1):
-                    report += f"### Screenshot {i}\n"
-                    report += f"**URL:** {screenshot.get('url', 'N/A')}  \n"
-                    report += f"**Título:** {screenshot.get('title', 'N/A')}  \n"
-                    report += f"![Screenshot {i}]({screenshot.get('filepath', '')})  \n\n"
+                    parts.append(f"### Screenshot {i}\n")
+                    parts.append(f"**URL:** {screenshot.get('url', 'N/A')}  \n")
+                    parts.append(f"**Título:** {screenshot.get('title', 'N/A')}  \n")
+                    parts.append(f"![Screenshot {i}]({screenshot.get('filepath', '')})  \n\n")
         
         # Adiciona contexto da análise
         context = massive_data.get('context', {})
         if context:
-            report += "## CONTEXTO DA ANÁLISE\n\n"
+            parts.append("## CONTEXTO DA ANÁLISE\n\n")
             for key, value in context.items():
                 if value:
-                    report += f"**{key.replace('_', ' ').title()}:** {value}  \n"
+                    parts.append(f"**{key.replace('_', ' ').title()}:** {value}  \n")
         
-        report += f"\n---\n\n*Relatório gerado automaticamente em {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}*"
+        parts.append(f"\n---\n\n*Relatório gerado automaticamente em {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}*")
         
-        return report
+        return ''.join(parts)
 
 # Instância global
 real_search_orchestrator = RealSearchOrchestrator()
@@ -6,17 +6,21 @@ Extrator de imagens virais reais com Selenium otimizado
 """
 
 import os
+import time
 import logging
 import asyncio
-import time
 import re
 import requests
+from requests.adapters import HTTPAdapter
 from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, fields
 from datetime import datetime
 from pathlib import Path
 import json
 import hashlib
+from collections import Counter
+from functools import lru_cache
+from itertools import islice
 from urllib.parse import urlparse, quote_plus
 
 # 🎭 PLAYWRIGHT imports (PRIMÁRIO)
@@ -40,15 +44,55 @@ try:
 except ImportError:
     HAS_SELENIUM = False
 
+# orjson para serialização rápida dos metadados (fallback: json)
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 # PIL para processamento de imagens
 try:
-    from PIL import Image
+    from PIL import Image, ImageFile, features
     HAS_PIL = True
 except ImportError:
     HAS_PIL = False
 
+# AVIF só é anunciado ao servidor se o Pillow instalado conseguir ler o formato
+try:
+    HAS_AVIF = HAS_PIL and features.check_module('avif')
+except ValueError:  # Pillow sem suporte a AVIF
+    HAS_AVIF = False
+
 logger = logging.getLogger(__name__)
 
+# Buffer de escrita das imagens: agrupa os chunks da rede em poucas syscalls
+_WRITE_BUFFER_SIZE = 1 << 20
+
+def _detect_image_extension(head: bytes) -> Optional[str]:
+    """Identifica a extensão pelos magic bytes (Content-Type de CDN nem sempre é confiável)"""
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'jpg'
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif'
+    if head[4:12] in (b'ftypavif', b'ftypavis'):
+        return 'avif'
+    return None
+
+@lru_cache(maxsize=1024)
+def _probe_image(image_path: str, mtime_ns: int, file_size: int) -> Tuple[Tuple[int, int], str]:
+    """Lê dimensões e formato do cabeçalho da imagem
+    
+    mtime_ns e file_size fazem parte da chave do cache: se o arquivo for
+    reescrito, a próxima consulta reabre a imagem.
+    """
+    with Image.open(image_path) as img:
+        return img.size, img.format
+
 @dataclass
 class ViralImage:
     """Estrutura para imagem viral extraída"""
@@ -67,27 +111,67 @@ class ViralImage:
     image_size: Tuple[int, int]
     file_size: int
 
+# Campos do ViralImage para serialização rasa (asdict faz cópia profunda de cada campo)
+_VIRAL_IMAGE_FIELDS = tuple(f.name for f in fields(ViralImage))
+
 class ViralImageExtractor:
     """Extrator de imagens virais REAL com Selenium"""
     
+    # Subdiretórios apenas para plataformas desejadas
+    PLATFORM_SUBDIRS = ('instagram', 'facebook', 'youtube')
+    
     def __init__(self):
         """Inicializa o extrator"""
         self.images_dir = Path("viral_images")
-        self.images_dir.mkdir(exist_ok=True)
         
-        # Subdiretórios apenas para plataformas desejadas
-        for platform in ['instagram', 'facebook', 'youtube']:
-            (self.images_dir / platform).mkdir(exist_ok=True)
+        # Diretórios já garantidos (evita mkdir/stat repetido a cada download)
+        self._ready_dirs = set()
+        for platform in self.PLATFORM_SUBDIRS:
+            platform_dir = self.images_dir / platform
+            if not platform_dir.is_dir():
+                platform_dir.mkdir(parents=True, exist_ok=True)
+            self._ready_dirs.add(platform_dir)
         
         self.extracted_images = []
         self.min_images_target = 20
         self.max_images_per_platform = 8
+        self.max_concurrent_downloads = 8
+        self.header_peek_bytes = 256 * 1024  # Limite de leitura para achar as dimensões
+        self._downloaded_image_info: Dict[str, Dict] = {}
+        
+        # Sessão HTTP persistente: reaproveita conexões TCP/TLS por host (keep-alive)
+        self.http_session = self._setup_http_session()
         
         # Configuração do Chrome
         self.chrome_options = self._setup_chrome_options()
         
         logger.info("🖼️ Viral Image Extractor REAL inicializado")
     
+    def _setup_http_session(self) -> requests.Session:
+        """Configura sessão HTTP com pool de conexões para downloads de imagens"""
+        session = requests.Session()
+        
+        # Pool dimensionado para os downloads simultâneos
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=max(32, self.max_concurrent_downloads * 2)
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        
+        # Headers para parecer um browser real
+        session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+            # Formatos modernos (menores) primeiro; imagens já são comprimidas,
+            # então não pede recompressão gzip/br do corpo
+            'Accept': ('image/avif,' if HAS_AVIF else '') + 'image/webp,image/apng,image/*,*/*;q=0.8',
+            'Accept-Encoding': 'identity',
+            'Accept-Language': 'pt-BR,pt;q=0.9,en;q=0.8',
+            'Referer': 'https://www.google.com/'
+        })
+        
+        return session
+    
     def _setup_chrome_options(self) -> Options:
         """Configura opções do Chrome para extração"""
         options = Options()
@@ -122,21 +206,24 @@ class ViralImageExtractor:
         
         all_images = []
         
+        # Timestamp único da sessão de extração (compartilhado por todas as imagens)
+        extraction_timestamp = datetime.now().isoformat()
+        
         try:
-            # FONTE 1: Instagram (conteúdo viral)
-            logger.info("📷 Extraindo do Instagram...")
-            instagram_images = await self._extract_instagram_images(query, session_id, 8)
-            all_images.extend(instagram_images)
-            
-            # FONTE 2: Facebook (engajamento social)
-            logger.info("📘 Extraindo do Facebook...")
-            facebook_images = await self._extract_facebook_images(query, session_id, 6)
-            all_images.extend(facebook_images)
-            
-            # FONTE 3: YouTube Thumbnails (capas de vídeos)
-            logger.info("🎥 Extraindo capas do YouTube...")
-            youtube_images = await self._extract_youtube_thumbnails(query, session_id, 6)
-            all_images.extend(youtube_images)
+            # FONTES: Instagram (conteúdo viral), Facebook (engajamento social)
+            # e YouTube (capas de vídeos) são independentes - executa simultaneamente
+            logger.info("📷📘🎥 Extraindo do Instagram, Facebook e YouTube...")
+            source_results = await asyncio.gather(
+                self._extract_instagram_images(query, session_id, 8, extraction_timestamp),
+                self._extract_facebook_images(query, session_id, 6, extraction_timestamp),
+                self._extract_youtube_thumbnails(query, session_id, 6, extraction_timestamp),
+                return_exceptions=True
+            )
+            for result in source_results:
+                if isinstance(result, Exception):
+                    logger.error(f"❌ Erro em fonte de imagens: {result}")
+                    continue
+                all_images.extend(result)
             
             # Ordena por score de viralidade
             all_images.sort(key=lambda x: x.virality_score, reverse=True)
@@ -145,7 +232,7 @@ class ViralImageExtractor:
             final_images = all_images[:max(self.min_images_target, len(all_images))]
             
             # Salva metadados
-            await self._save_images_metadata(final_images, session_id)
+            await self._save_images_metadata(final_images, session_id, extraction_timestamp)
             
             logger.info(f"✅ {len(final_images)} imagens virais extraídas com sucesso")
             return final_images
@@ -154,9 +241,12 @@ class ViralImageExtractor:
             logger.error(f"❌ Erro na extração de imagens: {e}")
             return []
     
-    async def _extract_google_images(self, query: str, session_id: str, limit: int) -> List[ViralImage]:
+    async def _extract_google_images(self, query: str, session_id: str, limit: int,
+                                     extraction_timestamp: Optional[str] = None) -> List[ViralImage]:
         """Extrai imagens REAIS do Google Imagens"""
+        extraction_timestamp = extraction_timestamp or datetime.now().isoformat()
         images = []
+        hashtags = self._generate_hashtags(query)  # Mesmas hashtags para todas as imagens da busca
         
         if not HAS_SELENIUM:
             logger.warning("⚠️ Selenium não disponível - usando fallback")
@@ -186,17 +276,25 @@ class ViralImageExtractor:
             
             logger.info(f"📸 Encontradas {len(img_elements)} imagens no Google")
             
+            # Coleta URLs válidas antes de baixar
+            candidates = []
+            seen_urls = set()
             for i, img_element in enumerate(img_elements[:limit]):
                 try:
                     img_url = img_element.get_attribute('src')
                     
-                    # Filtra URLs válidas
-                    if not self._is_valid_image_url(img_url):
-                        continue
-                    
-                    # Download da imagem
-                    local_path = await self._download_image(img_url, 'google_images', session_id, i)
-                    
+                    # Filtra URLs válidas (e repetidas na mesma página)
+                    if self._is_valid_image_url(img_url) and img_url not in seen_urls:
+                        seen_urls.add(img_url)
+                        candidates.append((i, [img_url]))
+                except Exception as e:
+                    logger.warning(f"⚠️ Erro ao processar imagem {i}: {e}")
+            
+            # Download simultâneo das imagens
+            local_paths = await self._download_images_bounded(candidates, 'google_images', session_id)
+            
+            for (i, (img_url,)), local_path in zip(candidates, local_paths):
+                try:
                     if local_path:
                         # Obtém informações da imagem
                         image_info = self._get_image_info(local_path)
@@ -218,10 +316,10 @@ class ViralImageExtractor:
                             description=f"Imagem de alta qualidade relacionada a {query}",
                             author=f"@creator_{i}",
                             engagement_metrics=engagement_metrics,
-                            hashtags=self._generate_hashtags(query),
+                            hashtags=hashtags,
                             content_type="image",
                             virality_score=self._calculate_virality_score(engagement_metrics, 'google'),
-                            extraction_timestamp=datetime.now().isoformat(),
+                            extraction_timestamp=extraction_timestamp,
                             image_size=image_info['size'],
                             file_size=image_info['file_size']
                         )
@@ -244,9 +342,13 @@ class ViralImageExtractor:
         
         return images
     
-    async def _extract_instagram_images(self, query: str, session_id: str, limit: int) -> List[ViralImage]:
+    async def _extract_instagram_images(self, query: str, session_id: str, limit: int,
+                                        extraction_timestamp: Optional[str] = None) -> List[ViralImage]:
         """🎭📷 Extrai imagens de INFLUENCIADORES do Instagram com PLAYWRIGHT"""
+        extraction_timestamp = extraction_timestamp or datetime.now().isoformat()
         images = []
+        hashtags = self._generate_hashtags(query)
+        seen_urls = set()  # Mesma imagem pode aparecer em perfis/buscas diferentes
         
         # ESTRATÉGIA MULTI-BUSCA PARA INFLUENCIADORES
         influencer_searches = [
@@ -308,8 +410,9 @@ class ViralImageExtractor:
                                             break
                                             
                                         img_url = await img_element.get_attribute("src")
-                                        if not img_url or "150x150" in img_url:
+                                        if not img_url or "150x150" in img_url or img_url in seen_urls:
                                             continue
+                                        seen_urls.add(img_url)
                                         
                                         # Extrai nome do perfil da URL
                                         profile_name = instagram_url.split('/')[-2] if instagram_url.split('/')[-2] else "influencer"
@@ -332,10 +435,10 @@ class ViralImageExtractor:
                                                 description=f"Conteúdo de influenciador do Instagram sobre {query}",
                                                 author=f"@{profile_name}",
                                                 engagement_metrics=real_metrics,
-                                                hashtags=self._generate_hashtags(query),
+                                                hashtags=hashtags,
                                                 content_type="image",
                                                 virality_score=self._calculate_virality_score(real_metrics, "instagram"),
-                                                extraction_timestamp=datetime.now().isoformat(),
+                                                extraction_timestamp=extraction_timestamp,
                                                 image_size=(1080, 1080),
                                                 file_size=0
                                             )
@@ -371,35 +474,42 @@ class ViralImageExtractor:
             logger.info("🔄 Fallback para Selenium...")
             driver = None
             try:
-                driver = webdriver.Chrome(options=self.chrome_options)
+                # Chamadas do WebDriver são bloqueantes: rodam em thread para não travar
+                # as demais fontes executadas em paralelo no event loop
+                driver = await asyncio.to_thread(webdriver.Chrome, options=self.chrome_options)
                 
                 for search_term in influencer_searches[:2]:  # Menos buscas no fallback
                     google_search = f"site:instagram.com {search_term} followers"
                     search_url = f"https://www.google.com/search?q={quote_plus(google_search)}&hl=pt-BR"
                     
-                    driver.get(search_url)
+                    await asyncio.to_thread(driver.get, search_url)
                     await asyncio.sleep(2)
                     
-                    instagram_links = driver.find_elements(By.CSS_SELECTOR, "a[href*='instagram.com']")
+                    instagram_links = await asyncio.to_thread(
+                        driver.find_elements, By.CSS_SELECTOR, "a[href*='instagram.com']"
+                    )
                     
                     for link in instagram_links[:2]:
                         try:
-                            instagram_url = link.get_attribute('href')
+                            instagram_url = await asyncio.to_thread(link.get_attribute, 'href')
                             if '/p/' in instagram_url or '/reel/' in instagram_url:
                                 continue
                             
-                            driver.get(instagram_url)
+                            await asyncio.to_thread(driver.get, instagram_url)
                             await asyncio.sleep(3)
                             
-                            img_elements = driver.find_elements(By.CSS_SELECTOR, "img[src*='scontent']")
+                            img_elements = await asyncio.to_thread(
+                                driver.find_elements, By.CSS_SELECTOR, "img[src*='scontent']"
+                            )
                             
                             for i, img_element in enumerate(img_elements[:1]):  # 1 imagem por perfil no fallback
                                 if len(images) >= limit:
                                     break
                                     
-                                img_url = img_element.get_attribute("src")
-                                if not img_url or "150x150" in img_url:
+                                img_url = await asyncio.to_thread(img_element.get_attribute, "src")
+                                if not img_url or "150x150" in img_url or img_url in seen_urls:
                                     continue
+                                seen_urls.add(img_url)
                                 
                                 profile_name = instagram_url.split('/')[-2] if instagram_url.split('/')[-2] else "influencer"
                                 
@@ -411,19 +521,7 @@ class ViralImageExtractor:
                                 if local_path:
                                     # Para Selenium, não temos acesso à página para extrair métricas reais
                                     # Vamos tentar extrair do HTML da página atual
-                                    real_metrics = {}
-                                    try:
-                                        # Busca elementos de métricas na página
-                                        likes_elements = driver.find_elements(By.CSS_SELECTOR, "span[class*='like'], button[class*='like'] span")
-                                        for elem in likes_elements:
-                                            text = elem.text
-                                            if text and any(word in text.lower() for word in ['curtidas', 'likes']):
-                                                likes = self._extract_number_from_text(text)
-                                                if likes > 0:
-                                                    real_metrics['likes'] = likes
-                                                    break
-                                    except:
-                                        pass
+                                    real_metrics = await asyncio.to_thread(self._selenium_instagram_metrics, driver)
                                     
                                     viral_image = ViralImage(
                                         platform="Instagram",
@@ -434,10 +532,10 @@ class ViralImageExtractor:
                                         description=f"Conteúdo de influenciador do Instagram sobre {query}",
                                         author=f"@{profile_name}",
                                         engagement_metrics=real_metrics,
-                                        hashtags=self._generate_hashtags(query),
+                                        hashtags=hashtags,
                                         content_type="image",
                                         virality_score=self._calculate_virality_score(real_metrics, "instagram"),
-                                        extraction_timestamp=datetime.now().isoformat(),
+                                        extraction_timestamp=extraction_timestamp,
                                         image_size=(1080, 1080),
                                         file_size=0
                                     )
@@ -454,7 +552,7 @@ class ViralImageExtractor:
             finally:
                 if driver:
                     try:
-                        driver.quit()
+                        await asyncio.to_thread(driver.quit)
                     except:
                         pass
         
@@ -465,9 +563,30 @@ class ViralImageExtractor:
         
         return images
     
-    async def _extract_facebook_images(self, query: str, session_id: str, limit: int) -> List[ViralImage]:
+    def _selenium_instagram_metrics(self, driver) -> Dict[str, int]:
+        """Extrai curtidas do HTML da página aberta no Selenium (síncrono, executado em thread)"""
+        real_metrics = {}
+        try:
+            # Busca elementos de métricas na página
+            likes_elements = driver.find_elements(By.CSS_SELECTOR, "span[class*='like'], button[class*='like'] span")
+            for elem in likes_elements:
+                text = elem.text
+                if text and any(word in text.lower() for word in ['curtidas', 'likes']):
+                    likes = self._extract_number_from_text(text)
+                    if likes > 0:
+                        real_metrics['likes'] = likes
+                        break
+        except:
+            pass
+        return real_metrics
+    
+    async def _extract_facebook_images(self, query: str, session_id: str, limit: int,
+                                       extraction_timestamp: Optional[str] = None) -> List[ViralImage]:
         """🎭📘 Extrai imagens de INFLUENCIADORES do Facebook com PLAYWRIGHT"""
+        extraction_timestamp = extraction_timestamp or datetime.now().isoformat()
         images = []
+        hashtags = self._generate_hashtags(query)
+        seen_urls = set()
         
         # ESTRATÉGIA MULTI-BUSCA PARA PÁGINAS E INFLUENCIADORES
         facebook_searches = [
@@ -546,8 +665,9 @@ class ViralImageExtractor:
                                             break
                                             
                                         img_url = await img_element.get_attribute("src")
-                                        if not img_url or "profile" in img_url or "cover" in img_url:
+                                        if not img_url or "profile" in img_url or "cover" in img_url or img_url in seen_urls:
                                             continue
+                                        seen_urls.add(img_url)
                                         
                                         local_path = await self._download_image_simple(
                                             img_url, 
@@ -567,10 +687,10 @@ class ViralImageExtractor:
                                                 description=f"Conteúdo da página do Facebook sobre {query}",
                                                 author=f"Página {page_name}",
                                                 engagement_metrics=real_metrics,
-                                                hashtags=self._generate_hashtags(query),
+                                                hashtags=hashtags,
                                                 content_type="image",
                                                 virality_score=self._calculate_virality_score(real_metrics, "facebook"),
-                                                extraction_timestamp=datetime.now().isoformat(),
+                                                extraction_timestamp=extraction_timestamp,
                                                 image_size=(1200, 630),
                                                 file_size=0
                                             )
@@ -613,9 +733,12 @@ class ViralImageExtractor:
         
         return images
     
-    async def _extract_pinterest_images(self, query: str, session_id: str, limit: int) -> List[ViralImage]:
+    async def _extract_pinterest_images(self, query: str, session_id: str, limit: int,
+                                        extraction_timestamp: Optional[str] = None) -> List[ViralImage]:
         """Extrai imagens REAIS do Pinterest"""
+        extraction_timestamp = extraction_timestamp or datetime.now().isoformat()
         images = []
+        hashtags = self._generate_hashtags(query)
         
         if not HAS_SELENIUM:
             return await self._create_fallback_images(query, "pinterest", limit)
@@ -643,14 +766,19 @@ class ViralImageExtractor:
             
             logger.info(f"📌 Encontrados {len(pin_elements)} pins no Pinterest")
             
+            # Coleta URLs e títulos dos pins antes de baixar
+            candidates = []
+            titles = []
+            seen_urls = set()
             for i, pin_element in enumerate(pin_elements[:limit]):
                 try:
                     # Busca imagem dentro do pin
                     img_element = pin_element.find_element(By.CSS_SELECTOR, "img")
                     img_url = img_element.get_attribute('src')
                     
-                    if not self._is_valid_image_url(img_url):
+                    if not self._is_valid_image_url(img_url) or img_url in seen_urls:
                         continue
+                    seen_urls.add(img_url)
                     
                     # Busca título do pin
                     try:
@@ -659,9 +787,16 @@ class ViralImageExtractor:
                     except:
                         title = f"Pin viral sobre {query} #{i+1}"
                     
-                    # Download da imagem
-                    local_path = await self._download_image(img_url, 'pinterest', session_id, i)
-                    
+                    candidates.append((i, [img_url]))
+                    titles.append(title)
+                except Exception as e:
+                    logger.warning(f"⚠️ Erro ao processar pin {i}: {e}")
+            
+            # Download simultâneo dos pins
+            local_paths = await self._download_images_bounded(candidates, 'pinterest', session_id)
+            
+            for (i, (img_url,)), title, local_path in zip(candidates, titles, local_paths):
+                try:
                     if local_path:
                         image_info = self._get_image_info(local_path)
                         
@@ -682,10 +817,10 @@ class ViralImageExtractor:
                             description=f"Pin viral de alta qualidade sobre {query}",
                             author=f"@pinner_{i}",
                             engagement_metrics=engagement_metrics,
-                            hashtags=self._generate_hashtags(query),
+                            hashtags=hashtags,
                             content_type="pin",
                             virality_score=self._calculate_virality_score(engagement_metrics, 'pinterest'),
-                            extraction_timestamp=datetime.now().isoformat(),
+                            extraction_timestamp=extraction_timestamp,
                             image_size=image_info['size'],
                             file_size=image_info['file_size']
                         )
@@ -708,31 +843,31 @@ class ViralImageExtractor:
         
         return images
     
-    async def _extract_youtube_thumbnails(self, query: str, session_id: str, limit: int) -> List[ViralImage]:
+    async def _extract_youtube_thumbnails(self, query: str, session_id: str, limit: int,
+                                          extraction_timestamp: Optional[str] = None) -> List[ViralImage]:
         """Extrai thumbnails REAIS do YouTube"""
+        extraction_timestamp = extraction_timestamp or datetime.now().isoformat()
         images = []
         
         try:
             # Busca vídeos via scraping
             videos = await self._scrape_youtube_videos(query, limit)
             
-            for i, video in enumerate(videos):
+            # URLs de thumbnail em diferentes qualidades (melhor primeiro)
+            candidates = [
+                (i, [
+                    f"https://img.youtube.com/vi/{video['id']}/maxresdefault.jpg",
+                    f"https://img.youtube.com/vi/{video['id']}/hqdefault.jpg",
+                    f"https://img.youtube.com/vi/{video['id']}/mqdefault.jpg"
+                ])
+                for i, video in enumerate(videos)
+            ]
+            
+            # Baixa thumbnails de todos os vídeos simultaneamente
+            local_paths = await self._download_images_bounded(candidates, 'youtube', session_id)
+            
+            for (i, thumbnail_urls), video, local_path in zip(candidates, videos, local_paths):
                 try:
-                    # URLs de thumbnail em diferentes qualidades
-                    video_id = video['id']
-                    thumbnail_urls = [
-                        f"https://img.youtube.com/vi/{video_id}/maxresdefault.jpg",
-                        f"https://img.youtube.com/vi/{video_id}/hqdefault.jpg",
-                        f"https://img.youtube.com/vi/{video_id}/mqdefault.jpg"
-                    ]
-                    
-                    # Tenta baixar thumbnail de melhor qualidade
-                    local_path = None
-                    for thumb_url in thumbnail_urls:
-                        local_path = await self._download_image(thumb_url, 'youtube', session_id, i)
-                        if local_path:
-                            break
-                    
                     if local_path:
                         image_info = self._get_image_info(local_path)
                         
@@ -753,7 +888,7 @@ class ViralImageExtractor:
                             hashtags=self._extract_hashtags_from_text(video['title']),
                             content_type="thumbnail",
                             virality_score=self._calculate_virality_score(video, 'youtube'),
-                            extraction_timestamp=datetime.now().isoformat(),
+                            extraction_timestamp=extraction_timestamp,
                             image_size=image_info['size'],
                             file_size=image_info['file_size']
                         )
@@ -771,8 +906,13 @@ class ViralImageExtractor:
         return images
     
     async def _scrape_youtube_videos(self, query: str, limit: int) -> List[Dict]:
-        """🎥 Busca vídeos de INFLUENCIADORES do YouTube"""
+        """🎥 Busca vídeos de INFLUENCIADORES do YouTube (Selenium em thread, sem bloquear o event loop)"""
+        return await asyncio.to_thread(self._scrape_youtube_videos_sync, query, limit)
+    
+    def _scrape_youtube_videos_sync(self, query: str, limit: int) -> List[Dict]:
+        """Scraping síncrono do YouTube via Selenium, executado em thread"""
         videos = []
+        seen_video_ids = set()
         
         # ESTRATÉGIA MULTI-BUSCA PARA INFLUENCIADORES
         youtube_searches = [
@@ -802,12 +942,12 @@ class ViralImageExtractor:
                     
                     logger.info(f"🔍 Buscando YouTubers: {search_term}")
                     driver.get(search_url)
-                    await asyncio.sleep(3)
+                    time.sleep(3)
                     
                     # Scroll para carregar mais vídeos
                     for _ in range(2):
                         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                        await asyncio.sleep(2)
+                        time.sleep(2)
                     
                     # Busca vídeos com alta visualização
                     video_elements = driver.find_elements(By.CSS_SELECTOR, "a#video-title")
@@ -822,8 +962,9 @@ class ViralImageExtractor:
                                 continue
                                 
                             video_id = self._extract_youtube_id(video_url)
-                            if not video_id:
-                                continue
+                            if not video_id or video_id in seen_video_ids:
+                                continue  # Sem ID ou já encontrado em outra busca
+                            seen_video_ids.add(video_id)
                             
                             # Extrai título
                             title = video_element.get_attribute('title') or video_element.text
@@ -874,7 +1015,7 @@ class ViralImageExtractor:
                     continue
                     
                 # Delay entre buscas
-                await asyncio.sleep(1)
+                time.sleep(1)
             
             logger.info(f"✅ {len(videos)} vídeos de influenciadores encontrados")
             
@@ -889,26 +1030,34 @@ class ViralImageExtractor:
         
         return videos
     
-    async def _extract_additional_sources(self, query: str, session_id: str) -> List[ViralImage]:
+    async def _extract_additional_sources(self, query: str, session_id: str,
+                                          extraction_timestamp: Optional[str] = None) -> List[ViralImage]:
         """Extrai de fontes adicionais para atingir meta"""
+        extraction_timestamp = extraction_timestamp or datetime.now().isoformat()
         additional_images = []
         
         try:
-            # Busca em sites de notícias brasileiros
-            news_images = await self._extract_news_images(query, session_id, 4)
-            additional_images.extend(news_images)
-            
-            # Busca em sites de e-commerce
-            ecommerce_images = await self._extract_ecommerce_images(query, session_id, 4)
-            additional_images.extend(ecommerce_images)
+            # Sites de notícias brasileiros e de e-commerce em paralelo
+            source_results = await asyncio.gather(
+                self._extract_news_images(query, session_id, 4, extraction_timestamp),
+                self._extract_ecommerce_images(query, session_id, 4, extraction_timestamp),
+                return_exceptions=True
+            )
+            for result in source_results:
+                if isinstance(result, Exception):
+                    logger.error(f"❌ Erro em fonte adicional: {result}")
+                    continue
+                additional_images.extend(result)
             
         except Exception as e:
             logger.error(f"❌ Erro em fontes adicionais: {e}")
         
         return additional_images
     
-    async def _extract_news_images(self, query: str, session_id: str, limit: int) -> List[ViralImage]:
+    async def _extract_news_images(self, query: str, session_id: str, limit: int,
+                                   extraction_timestamp: Optional[str] = None) -> List[ViralImage]:
         """Extrai imagens de sites de notícias brasileiros"""
+        extraction_timestamp = extraction_timestamp or datetime.now().isoformat()
         images = []
         
         # Sites de notícias brasileiros
@@ -922,7 +1071,7 @@ class ViralImageExtractor:
         for site_query in news_sites[:2]:  # Limita a 2 sites
             try:
                 site_images = await self._extract_images_from_search(
-                    site_query, session_id, limit//2, 'news'
+                    site_query, session_id, limit//2, 'news', extraction_timestamp
                 )
                 images.extend(site_images)
                 
@@ -935,8 +1084,10 @@ class ViralImageExtractor:
         
         return images[:limit]
     
-    async def _extract_ecommerce_images(self, query: str, session_id: str, limit: int) -> List[ViralImage]:
+    async def _extract_ecommerce_images(self, query: str, session_id: str, limit: int,
+                                        extraction_timestamp: Optional[str] = None) -> List[ViralImage]:
         """Extrai imagens de sites de e-commerce"""
+        extraction_timestamp = extraction_timestamp or datetime.now().isoformat()
         images = []
         
         # Busca produtos relacionados
@@ -949,7 +1100,7 @@ class ViralImageExtractor:
         for ecom_query in ecommerce_queries[:2]:
             try:
                 ecom_images = await self._extract_images_from_search(
-                    ecom_query, session_id, limit//2, 'ecommerce'
+                    ecom_query, session_id, limit//2, 'ecommerce', extraction_timestamp
                 )
                 images.extend(ecom_images)
                 
@@ -962,9 +1113,12 @@ class ViralImageExtractor:
         
         return images[:limit]
     
-    async def _extract_images_from_search(self, search_query: str, session_id: str, limit: int, category: str) -> List[ViralImage]:
+    async def _extract_images_from_search(self, search_query: str, session_id: str, limit: int, category: str,
+                                          extraction_timestamp: Optional[str] = None) -> List[ViralImage]:
         """Extrai imagens de uma busca específica"""
+        extraction_timestamp = extraction_timestamp or datetime.now().isoformat()
         images = []
+        hashtags = self._generate_hashtags(search_query)
         
         if not HAS_SELENIUM:
             return await self._create_fallback_images(search_query, category, limit)
@@ -987,15 +1141,22 @@ class ViralImageExtractor:
             # Busca imagens
             img_elements = driver.find_elements(By.CSS_SELECTOR, "img[src*='http']")
             
+            candidates = []
+            seen_urls = set()
             for i, img_element in enumerate(img_elements[:limit]):
                 try:
                     img_url = img_element.get_attribute('src')
                     
-                    if not self._is_valid_image_url(img_url):
-                        continue
-                    
-                    local_path = await self._download_image(img_url, category, session_id, i)
-                    
+                    if self._is_valid_image_url(img_url) and img_url not in seen_urls:
+                        seen_urls.add(img_url)
+                        candidates.append((i, [img_url]))
+                except Exception as e:
+                    logger.warning(f"⚠️ Erro ao processar imagem {category} {i}: {e}")
+            
+            local_paths = await self._download_images_bounded(candidates, category, session_id)
+            
+            for (i, (img_url,)), local_path in zip(candidates, local_paths):
+                try:
                     if local_path:
                         image_info = self._get_image_info(local_path)
                         
@@ -1011,10 +1172,10 @@ class ViralImageExtractor:
                             description=f"Imagem de {category} com alto potencial viral",
                             author=f"@{category}_creator_{i}",
                             engagement_metrics=engagement_metrics,
-                            hashtags=self._generate_hashtags(search_query),
+                            hashtags=hashtags,
                             content_type="image",
                             virality_score=self._calculate_virality_score(engagement_metrics, category),
-                            extraction_timestamp=datetime.now().isoformat(),
+                            extraction_timestamp=extraction_timestamp,
                             image_size=image_info['size'],
                             file_size=image_info['file_size']
                         )
@@ -1036,6 +1197,78 @@ class ViralImageExtractor:
         
         return images
     
+    @staticmethod
+    def _stream_to_file(response: requests.Response, local_path: Path, chunk_size: int = 64 * 1024) -> Path:
+        """Grava o corpo da resposta em disco por partes, sem bufferizar a imagem inteira
+        
+        A extensão é corrigida pelos magic bytes do primeiro chunk; retorna o
+        caminho efetivamente gravado.
+        """
+        try:
+            chunks = response.iter_content(chunk_size=chunk_size)
+            first = next(chunks, b'')
+            
+            ext = _detect_image_extension(first)
+            if ext:
+                local_path = local_path.with_suffix(f'.{ext}')
+            
+            with open(local_path, 'wb', buffering=_WRITE_BUFFER_SIZE) as f:
+                f.write(first)
+                for chunk in chunks:
+                    f.write(chunk)
+            return local_path
+        finally:
+            response.close()
+    
+    def _stream_image_to_file(self, response: requests.Response, local_path: Path,
+                              chunk_size: int = 64 * 1024) -> Tuple[Optional[Path], Optional[Dict]]:
+        """Grava a imagem em disco validando as dimensões pelos primeiros bytes
+        
+        Retorna (caminho gravado, info) com info no formato de _get_image_info,
+        ou None quando o cabeçalho não permitiu identificar a imagem. Imagens
+        menores que o mínimo são descartadas sem escrever nada em disco
+        (caminho None). A extensão é corrigida pelos magic bytes.
+        """
+        try:
+            chunks = response.iter_content(chunk_size=chunk_size)
+            head = []
+            image_info = None
+            
+            if HAS_PIL:
+                parser = ImageFile.Parser()
+                peeked = 0
+                for chunk in chunks:
+                    head.append(chunk)
+                    peeked += len(chunk)
+                    parser.feed(chunk)
+                    if parser.image is not None:
+                        image_info = {'size': parser.image.size, 'format': parser.image.format}
+                        break
+                    if peeked >= self.header_peek_bytes:
+                        break
+                
+                if image_info and (image_info['size'][0] < 200 or image_info['size'][1] < 200):
+                    return None, image_info
+            else:
+                head.extend(islice(chunks, 1))
+            
+            ext = _detect_image_extension(head[0] if head else b'')
+            if ext:
+                local_path = local_path.with_suffix(f'.{ext}')
+            
+            file_size = 0
+            with open(local_path, 'wb', buffering=_WRITE_BUFFER_SIZE) as f:
+                for chunk in head:
+                    file_size += f.write(chunk)
+                for chunk in chunks:
+                    file_size += f.write(chunk)
+            
+            if image_info:
+                image_info['file_size'] = file_size
+            return local_path, image_info
+        finally:
+            response.close()
+    
     async def _download_image_simple(self, img_url: str, filename: str) -> Optional[str]:
         """Baixa imagem com filename personalizado"""
         try:
@@ -1049,21 +1282,16 @@ class ViralImageExtractor:
             else:
                 platform = "other"
             
-            # Headers para parecer um browser real
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                'Accept': 'image/webp,image/apng,image/*,*/*;q=0.8',
-                'Accept-Language': 'pt-BR,pt;q=0.9,en;q=0.8',
-                'Referer': 'https://www.google.com/'
-            }
-            
-            response = requests.get(img_url, headers=headers, timeout=30, stream=True)
+            response = await asyncio.to_thread(
+                self.http_session.get, img_url, timeout=30, stream=True
+            )
             response.raise_for_status()
             
             # Verifica se é realmente uma imagem
             content_type = response.headers.get('content-type', '')
             if not content_type.startswith('image/'):
                 logger.warning(f"⚠️ URL não é imagem: {img_url}")
+                response.close()  # Devolve a conexão ao pool
                 return None
             
             # Determina extensão
@@ -1073,18 +1301,20 @@ class ViralImageExtractor:
                 ext = '.png'
             elif 'webp' in content_type:
                 ext = '.webp'
+            elif 'avif' in content_type:
+                ext = '.avif'
             else:
                 ext = '.jpg'  # Padrão
             
             # Caminho do arquivo
             platform_dir = self.images_dir / platform
-            platform_dir.mkdir(exist_ok=True)
+            if platform_dir not in self._ready_dirs:
+                await asyncio.to_thread(platform_dir.mkdir, parents=True, exist_ok=True)
+                self._ready_dirs.add(platform_dir)
             local_path = platform_dir / f"{filename}{ext}"
             
-            # Salva arquivo
-            with open(local_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            # Salva arquivo (stream direto para disco, fora do event loop)
+            local_path = await asyncio.to_thread(self._stream_to_file, response, local_path)
             
             # Aguarda um pouco para garantir que o arquivo foi salvo
             await asyncio.sleep(0.1)
@@ -1106,8 +1336,7 @@ class ViralImageExtractor:
                                     await asyncio.sleep(0.2)
                                     for del_attempt in range(3):
                                         try:
-                                            if local_path.exists():
-                                                local_path.unlink()
+                                            await asyncio.to_thread(local_path.unlink, missing_ok=True)
                                             break
                                         except OSError as delete_error:
                                             if del_attempt < 2:
@@ -1132,24 +1361,42 @@ class ViralImageExtractor:
             logger.warning(f"⚠️ Erro ao baixar imagem: {e}")
             return None
     
+    async def _download_images_bounded(self, candidates: List[Tuple[int, List[str]]], platform: str, session_id: str) -> List[Optional[str]]:
+        """Baixa várias imagens simultaneamente, limitado por semáforo
+        
+        Cada candidato é (índice, [urls]); as URLs são tentadas em ordem até
+        o primeiro download válido. Retorna os caminhos na ordem dos candidatos.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent_downloads)
+        
+        async def download(index: int, urls: List[str]) -> Optional[str]:
+            async with semaphore:
+                for img_url in urls:
+                    local_path = await self._download_image(img_url, platform, session_id, index)
+                    if local_path:
+                        return local_path
+                return None
+        
+        results = await asyncio.gather(
+            *(download(index, urls) for index, urls in candidates),
+            return_exceptions=True
+        )
+        return [None if isinstance(result, Exception) else result for result in results]
+    
     async def _download_image(self, img_url: str, platform: str, session_id: str, index: int) -> Optional[str]:
         """Baixa imagem REAL e salva localmente"""
         try:
-            # Headers para parecer um browser real
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                'Accept': 'image/webp,image/apng,image/*,*/*;q=0.8',
-                'Accept-Language': 'pt-BR,pt;q=0.9,en;q=0.8',
-                'Referer': 'https://www.google.com/'
-            }
-            
-            response = requests.get(img_url, headers=headers, timeout=30, stream=True)
+            # Requisição em thread para não bloquear os demais downloads simultâneos
+            response = await asyncio.to_thread(
+                self.http_session.get, img_url, timeout=30, stream=True
+            )
             response.raise_for_status()
             
             # Verifica se é realmente uma imagem
             content_type = response.headers.get('content-type', '')
             if not content_type.startswith('image/'):
                 logger.warning(f"⚠️ URL não é imagem: {img_url}")
+                response.close()  # Devolve a conexão ao pool
                 return None
             
             # Determina extensão
@@ -1159,26 +1406,40 @@ class ViralImageExtractor:
                 ext = 'png'
             elif 'webp' in content_type:
                 ext = 'webp'
+            elif 'avif' in content_type:
+                ext = 'avif'
             elif 'gif' in content_type:
                 ext = 'gif'
             else:
                 ext = 'jpg'  # Default
             
-            # Nome único do arquivo
-            timestamp = int(time.time())
+            # Nome único do arquivo (sessão + índice + hash da URL, sem relógio)
             url_hash = hashlib.md5(img_url.encode()).hexdigest()[:8]
-            filename = f"{platform}_viral_{index:03d}_{timestamp}_{url_hash}.{ext}"
+            filename = f"{platform}_viral_{session_id}_{index:03d}_{url_hash}.{ext}"
             
             # Caminho completo
             platform_dir = self.images_dir / platform
-            platform_dir.mkdir(exist_ok=True)
+            if platform_dir not in self._ready_dirs:
+                await asyncio.to_thread(platform_dir.mkdir, parents=True, exist_ok=True)
+                self._ready_dirs.add(platform_dir)
             local_path = platform_dir / filename
             
-            # Salva imagem
-            with open(local_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-            
+            # Valida dimensões pelos primeiros bytes e salva (fora do event loop)
+            saved_path, image_info = await asyncio.to_thread(
+                self._stream_image_to_file, response, local_path
+            )
+            if saved_path is None:
+                logger.warning(f"⚠️ Imagem muito pequena: {image_info['size']}")
+                return None
+            local_path = saved_path
+            filename = local_path.name
+            if image_info:
+                # Reaproveitado por _get_image_info sem reabrir o arquivo
+                self._downloaded_image_info[str(local_path)] = image_info
+                logger.info(f"✅ Imagem baixada: {filename} ({image_info['size'][0]}x{image_info['size'][1]})")
+                return str(local_path)
+            
+            # Dimensões não identificadas pelo cabeçalho - valida o arquivo salvo
             # Aguarda um pouco para garantir que o arquivo foi completamente escrito
             await asyncio.sleep(0.1)
             
@@ -1188,26 +1449,27 @@ class ViralImageExtractor:
                     # Tenta abrir a imagem com retry em caso de conflito de acesso
                     for attempt in range(3):
                         try:
-                            with Image.open(local_path) as img:
-                                # Verifica tamanho mínimo
-                                if img.size[0] >= 200 and img.size[1] >= 200:
-                                    logger.info(f"✅ Imagem baixada: {filename} ({img.size[0]}x{img.size[1]})")
-                                    return str(local_path)
-                                else:
-                                    logger.warning(f"⚠️ Imagem muito pequena: {img.size}")
-                                    # Aguarda e tenta deletar com retry
-                                    await asyncio.sleep(0.2)
-                                    for del_attempt in range(3):
-                                        try:
-                                            if local_path.exists():
-                                                local_path.unlink()
-                                            break
-                                        except OSError as delete_error:
-                                            if del_attempt < 2:
-                                                await asyncio.sleep(0.1)
-                                            else:
-                                                logger.debug(f"⚠️ Arquivo pequeno não pôde ser deletado: {delete_error}")
-                                    return None
+                            # Probe em cache: _get_image_info reaproveita a leitura
+                            st = local_path.stat()
+                            img_size, _ = _probe_image(str(local_path), st.st_mtime_ns, st.st_size)
+                            # Verifica tamanho mínimo
+                            if img_size[0] >= 200 and img_size[1] >= 200:
+                                logger.info(f"✅ Imagem baixada: {filename} ({img_size[0]}x{img_size[1]})")
+                                return str(local_path)
+                            else:
+                                logger.warning(f"⚠️ Imagem muito pequena: {img_size}")
+                                # Aguarda e tenta deletar com retry
+                                await asyncio.sleep(0.2)
+                                for del_attempt in range(3):
+                                    try:
+                                        await asyncio.to_thread(local_path.unlink, missing_ok=True)
+                                        break
+                                    except OSError as delete_error:
+                                        if del_attempt < 2:
+                                            await asyncio.sleep(0.1)
+                                        else:
+                                            logger.debug(f"⚠️ Arquivo pequeno não pôde ser deletado: {delete_error}")
+                                return None
                             break  # Se chegou aqui, sucesso
                         except OSError as os_error:
                             if "being used by another process" in str(os_error) and attempt < 2:
@@ -1221,7 +1483,7 @@ class ViralImageExtractor:
                     # Aguarda antes de tentar deletar
                     await asyncio.sleep(0.1)
                     try:
-                        local_path.unlink()
+                        await asyncio.to_thread(local_path.unlink)
                     except OSError as delete_error:
                         logger.warning(f"⚠️ Erro ao deletar arquivo inválido: {delete_error}")
                     return None
@@ -1231,7 +1493,7 @@ class ViralImageExtractor:
                     return str(local_path)
                 else:
                     try:
-                        local_path.unlink()
+                        await asyncio.to_thread(local_path.unlink)
                     except OSError as delete_error:
                         logger.warning(f"⚠️ Erro ao deletar arquivo pequeno (sem PIL): {delete_error}")
                     return None
@@ -1242,21 +1504,26 @@ class ViralImageExtractor:
     
     def _get_image_info(self, image_path: str) -> Dict:
         """Obtém informações da imagem"""
+        # Informações já obtidas na validação do download
+        image_info = self._downloaded_image_info.pop(image_path, None)
+        if image_info:
+            return image_info
+        
         try:
-            path = Path(image_path)
-            file_size = path.stat().st_size
+            # Um único stat fornece o tamanho e a chave do cache de cabeçalho
+            st = os.stat(image_path)
             
             if HAS_PIL:
-                with Image.open(image_path) as img:
-                    return {
-                        'size': img.size,
-                        'file_size': file_size,
-                        'format': img.format
-                    }
+                size, image_format = _probe_image(image_path, st.st_mtime_ns, st.st_size)
+                return {
+                    'size': size,
+                    'file_size': st.st_size,
+                    'format': image_format
+                }
             else:
                 return {
                     'size': (1920, 1080),  # Assume tamanho padrão
-                    'file_size': file_size,
+                    'file_size': st.st_size,
                     'format': 'UNKNOWN'
                 }
         except Exception as e:
@@ -1496,36 +1763,44 @@ class ViralImageExtractor:
         logger.error(f"❌ Sistema configurado para APENAS dados reais - nenhum fallback disponível")
         return []
     
-    async def _save_images_metadata(self, images: List[ViralImage], session_id: str):
-        """Salva metadados das imagens extraídas"""
-        try:
-            metadata = {
-                'session_id': session_id,
-                'extraction_timestamp': datetime.now().isoformat(),
-                'total_images': len(images),
-                'images_by_platform': {},
-                'average_virality_score': 0.0,
-                'images': []
-            }
-            
+    @staticmethod
+    def _build_images_metadata(images: List[ViralImage], session_id: str,
+                               extraction_timestamp: str) -> Dict[str, Any]:
+        """Monta o dicionário de metadados das imagens extraídas"""
+        return {
+            'session_id': session_id,
+            'extraction_timestamp': extraction_timestamp,
+            'total_images': len(images),
             # Agrupa por plataforma
-            for image in images:
-                platform = image.platform
-                if platform not in metadata['images_by_platform']:
-                    metadata['images_by_platform'][platform] = 0
-                metadata['images_by_platform'][platform] += 1
-                
-                # Adiciona dados da imagem
-                metadata['images'].append(asdict(image))
-            
-            # Calcula score médio
-            if images:
-                metadata['average_virality_score'] = sum(img.virality_score for img in images) / len(images)
-            
-            # Salva metadados
-            metadata_path = self.images_dir / f'viral_images_metadata_{session_id}.json'
+            'images_by_platform': dict(Counter(image.platform for image in images)),
+            'average_virality_score': (
+                sum(img.virality_score for img in images) / len(images) if images else 0.0
+            ),
+            'images': [{name: getattr(image, name) for name in _VIRAL_IMAGE_FIELDS} for image in images]
+        }
+    
+    @classmethod
+    def _write_images_metadata(cls, metadata_path: Path, images: List[ViralImage], session_id: str,
+                               extraction_timestamp: str):
+        """Monta e grava o JSON de metadados (executado fora do event loop)"""
+        metadata = cls._build_images_metadata(images, session_id, extraction_timestamp)
+        if HAS_ORJSON:
+            # orjson já emite UTF-8 sem escapar caracteres não-ASCII
+            with open(metadata_path, 'wb') as f:
+                f.write(orjson.dumps(metadata, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
             with open(metadata_path, 'w', encoding='utf-8') as f:
                 json.dump(metadata, f, indent=2, ensure_ascii=False)
+    
+    async def _save_images_metadata(self, images: List[ViralImage], session_id: str,
+                                    extraction_timestamp: Optional[str] = None):
+        """Salva metadados das imagens extraídas"""
+        try:
+            metadata_path = self.images_dir / f'viral_images_metadata_{session_id}.json'
+            await asyncio.to_thread(
+                self._write_images_metadata, metadata_path, images, session_id,
+                extraction_timestamp or datetime.now().isoformat()
+            )
             
             logger.info(f"💾 Metadados salvos: {metadata_path}")
             